@@ -0,0 +1,24 @@
+# FILE: /backend/apps/payments/encoders.py
+"""
+JSON encoder backed by orjson for payment JSONFields.
+Falls back to DjangoJSONEncoder when orjson is not installed or cannot
+represent a value (e.g. integers wider than 64 bits).
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONEncoder(DjangoJSONEncoder):
+    """Serialize in C via orjson; types it doesn't know go through DjangoJSONEncoder.default."""
+
+    def encode(self, o):
+        if orjson is None or self.indent is not None or self.sort_keys:
+            return super().encode(o)
+        try:
+            return orjson.dumps(o, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            return super().encode(o)
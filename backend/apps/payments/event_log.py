@@ -0,0 +1,116 @@
+# FILE: /backend/apps/payments/event_log.py
+"""
+Buffered writer for GatewayEventLog.
+
+Webhook handlers append log rows to an in-memory ring; a daemon thread flushes
+it with a single bulk INSERT ... ON CONFLICT DO NOTHING every
+GATEWAY_EVENT_LOG_FLUSH_INTERVAL seconds, or as soon as BATCH_SIZE rows are
+waiting. Duplicate payload hashes are dropped by the database instead of
+surfacing as IntegrityError. On PostgreSQL each batch commits with
+synchronous_commit off, so log writes never wait on a WAL fsync.
+
+Set GATEWAY_EVENT_LOG_FLUSH_INTERVAL = 0 to write synchronously (used in tests).
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import GatewayEventLog
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 64
+# Upper bound on rows held in memory; beyond it callers write their row inline
+MAX_BUFFERED = 10000
+
+
+class GatewayEventLogBuffer:
+    """Thread-safe ring of pending GatewayEventLog rows, flushed in batches."""
+
+    def __init__(self, batch_size=BATCH_SIZE, max_buffered=MAX_BUFFERED):
+        self.batch_size = batch_size
+        self.max_buffered = max_buffered
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'GATEWAY_EVENT_LOG_FLUSH_INTERVAL', 0.1)
+
+    def add(self, **fields):
+        """Queue one GatewayEventLog row for insertion."""
+        entry = GatewayEventLog(**fields)
+        if not self.flush_interval:
+            self._write([entry])
+            return
+
+        with self._lock:
+            buffered = len(self._events) < self.max_buffered
+            if buffered:
+                self._events.append(entry)
+            pending = len(self._events)
+        if not buffered:
+            # Flusher is falling behind: apply backpressure instead of dropping rows
+            self._write([entry])
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything currently buffered. Returns the number of rows submitted."""
+        with self._lock:
+            batch = list(self._events)
+            self._events.clear()
+        if batch:
+            self._write(batch)
+        return len(batch)
+
+    # ---- internals ----
+
+    def _write(self, batch):
+        # Only relax durability for a transaction we own, never a caller's
+        relax_commit = connection.vendor == 'postgresql' and not connection.in_atomic_block
+        try:
+            with transaction.atomic():
+                if relax_commit:
+                    # Audit rows can tolerate losing the last few hundred ms on a crash;
+                    # don't wait for the WAL flush on every batch.
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL synchronous_commit TO OFF")
+                GatewayEventLog.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+        except Exception:
+            logger.exception("Failed to write %d gateway event log(s)", len(batch))
+
+    def _ensure_flusher(self):
+        # Re-spawn after fork: threads do not survive into pre-forked workers
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name='gateway-event-log-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            # This thread owns its own DB connection; drop it if it went stale
+            close_old_connections()
+            self.flush()
+
+
+event_log_buffer = GatewayEventLogBuffer()
+atexit.register(event_log_buffer.flush)
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.28 on 2026-10-17 14:01
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("provider", models.CharField(max_length=20)),
+                ("event_id", models.CharField(max_length=100)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "webhook event",
+                "verbose_name_plural": "webhook events",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("provider", "event_id"),
+                        name="unique_webhook_event_per_provider",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.28 on 2026-10-17 15:20
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hex_to_digest(apps, schema_editor):
+    GatewayEventLog = apps.get_model("payments", "GatewayEventLog")
+    batch = []
+    for log in GatewayEventLog.objects.only("id", "payload_hash", "raw_payload").iterator(chunk_size=2000):
+        try:
+            log.payload_digest = bytes.fromhex(log.payload_hash)
+        except (TypeError, ValueError):
+            log.payload_digest = hashlib.sha256((log.raw_payload or "").encode()).digest()
+        batch.append(log)
+        if len(batch) >= 2000:
+            GatewayEventLog.objects.bulk_update(batch, ["payload_digest"])
+            batch = []
+    if batch:
+        GatewayEventLog.objects.bulk_update(batch, ["payload_digest"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_webhookevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gatewayeventlog",
+            name="payload_digest",
+            field=models.BinaryField(editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(hex_to_digest, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="gatewayeventlog",
+            name="payload_hash",
+        ),
+        migrations.RenameField(
+            model_name="gatewayeventlog",
+            old_name="payload_digest",
+            new_name="payload_hash",
+        ),
+        migrations.AlterField(
+            model_name="gatewayeventlog",
+            name="payload_hash",
+            field=models.BinaryField(blank=True, editable=False, max_length=32, unique=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-17 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0003_gatewayeventlog_binary_payload_hash"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="payment",
+            name="payments_pa_transac_8e9d99_idx",
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["transaction_id"],
+                include=("status", "amount", "currency"),
+                name="payment_txid_cover",
+            ),
+        ),
+    ]
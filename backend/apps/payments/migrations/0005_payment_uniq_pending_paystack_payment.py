@@ -0,0 +1,42 @@
+# Generated by Django 4.2.28 on 2026-10-17 16:02
+
+from django.db import migrations, models
+
+
+def cancel_duplicate_pending(apps, schema_editor):
+    # Keep the newest pending Paystack checkout per user/software; older
+    # duplicates would otherwise block the unique index from being built.
+    Payment = apps.get_model("payments", "Payment")
+    seen = set()
+    stale = []
+    pending = Payment.objects.filter(status="PENDING", payment_method="PAYSTACK").order_by(
+        "user_id", "software_id", "-created_at"
+    ).values_list("id", "user_id", "software_id")
+    for pk, user_id, software_id in pending.iterator():
+        if (user_id, software_id) in seen:
+            stale.append(pk)
+        else:
+            seen.add((user_id, software_id))
+    if stale:
+        Payment.objects.filter(pk__in=stale).update(
+            status="CANCELLED", status_reason="Superseded by a newer pending payment"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_payment_txid_cover"),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_pending, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("payment_method", "PAYSTACK"), ("status", "PENDING")),
+                fields=("user", "software"),
+                name="uniq_pending_paystack_payment",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-17 16:40
+
+import backend.apps.payments.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0005_payment_uniq_pending_paystack_payment"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="gatewayeventlog",
+            name="payload",
+            field=models.JSONField(
+                encoder=backend.apps.payments.encoders.ORJSONEncoder
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.28 on 2026-10-17 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0006_gatewayeventlog_payload_orjson"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="gatewayeventlog",
+            index=models.Index(
+                fields=["gateway", "event_type", "created_at"],
+                name="gel_gw_event_created_idx",
+            ),
+        ),
+    ]
@@ -12,6 +12,8 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.conf import settings
 
+from .encoders import ORJSONEncoder
+
 
 # ----------------------------------------------------------------------
 # AUDIT LOG MODEL – NEW, NON‑DISRUPTIVE ADDITION
@@ -26,12 +28,12 @@ class GatewayEventLog(models.Model):
     gateway = models.CharField(max_length=20, db_index=True)
     event_type = models.CharField(max_length=50, db_index=True, blank=True, null=True)
     reference = models.CharField(max_length=255, db_index=True, blank=True, null=True)
-    payload = models.JSONField()                         # Masked, parsed payload
+    payload = models.JSONField(encoder=ORJSONEncoder)    # Masked, parsed payload
     raw_payload = models.TextField(blank=True)           # Raw request body (for forensic replay)
     status_code = models.PositiveSmallIntegerField(default=200)
     error_message = models.TextField(blank=True)
     correlation_id = models.CharField(max_length=64, blank=True, db_index=True)
-    payload_hash = models.CharField(max_length=64, unique=True, blank=True, editable=False)
+    payload_hash = models.BinaryField(max_length=32, unique=True, blank=True, editable=False)  # Raw SHA-256 digest
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -40,6 +42,8 @@ class GatewayEventLog(models.Model):
         indexes = [
             models.Index(fields=["gateway", "-created_at"]),
             models.Index(fields=["reference", "gateway"]),
+            # Per-event-type timelines (e.g. all charge.failed in a window)
+            models.Index(fields=["gateway", "event_type", "created_at"], name="gel_gw_event_created_idx"),
             models.Index(fields=["correlation_id"]),
         ]
         ordering = ["-created_at"]
@@ -47,13 +51,39 @@ class GatewayEventLog(models.Model):
     def save(self, *args, **kwargs):
         # Generate a hash of the raw payload for deduplication
         if not self.payload_hash and self.raw_payload:
-            self.payload_hash = hashlib.sha256(self.raw_payload.encode()).hexdigest()
+            self.payload_hash = hashlib.sha256(self.raw_payload.encode()).digest()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.gateway} {self.event_type} {self.reference or ''}"
 
 
+class WebhookEvent(models.Model):
+    """
+    Idempotency ledger for inbound gateway webhooks.
+    A row is inserted as soon as an event is parsed; the unique
+    (provider, event_id) pair turns replayed deliveries into a single
+    failed INSERT instead of a full processing pass.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider = models.CharField(max_length=20)
+    event_id = models.CharField(max_length=100)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("webhook event")
+        verbose_name_plural = _("webhook events")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider", "event_id"],
+                name="unique_webhook_event_per_provider"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.event_id}"
+
+
 # ----------------------------------------------------------------------
 # COUPON USAGE – ENHANCED WITH PARTIAL UNIQUE CONSTRAINTS
 # ----------------------------------------------------------------------
@@ -216,11 +246,24 @@ class Payment(models.Model):
         verbose_name_plural = _("payments")
         indexes = [
             models.Index(fields=["user", "status"]),
-            models.Index(fields=["transaction_id"]),
+            # Covers the webhook's lock-free status probe (index-only scan on PostgreSQL)
+            models.Index(
+                fields=["transaction_id"],
+                include=["status", "amount", "currency"],
+                name="payment_txid_cover",
+            ),
             models.Index(fields=["created_at"]),
             models.Index(fields=["status", "created_at"]),
             models.Index(fields=["expires_at"]),  # For expiry cleanup jobs
         ]
+        constraints = [
+            # At most one open Paystack checkout per user and software
+            UniqueConstraint(
+                fields=["user", "software"],
+                condition=Q(status="PENDING", payment_method="PAYSTACK"),
+                name="uniq_pending_paystack_payment",
+            ),
+        ]
         ordering = ["-created_at"]
 
     def __str__(self):
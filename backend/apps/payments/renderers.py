@@ -0,0 +1,32 @@
+# FILE: /backend/apps/payments/renderers.py
+"""
+JSON renderer backed by orjson for the payment gateway endpoints.
+Falls back to DRF's JSONRenderer when orjson is not installed.
+"""
+from decimal import Decimal
+
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_default(obj):
+    # Match DRF's encoder for the types orjson doesn't handle natively
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Compact JSON via orjson; same media type and empty-body handling as JSONRenderer."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_orjson_default)
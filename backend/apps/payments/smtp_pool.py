@@ -0,0 +1,100 @@
+# FILE: /backend/apps/payments/smtp_pool.py
+"""
+Process-wide pool of warm email connections for payment notifications.
+
+Each Django mail backend opened here keeps its SMTP session (TCP + TLS + EHLO +
+AUTH) alive between tasks, so a burst of failure emails pays the handshake once
+per connection instead of once per message. Connections are health-checked with
+NOOP before reuse, recycled after MAX_MESSAGES_PER_CONNECTION sends, and closed
+with QUIT when the worker process exits.
+
+Works with any EMAIL_BACKEND; backends without a live SMTP session (console,
+locmem) simply skip the health check.
+"""
+import atexit
+import logging
+import queue
+import smtplib
+from contextlib import contextmanager
+
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 5
+MAX_MESSAGES_PER_CONNECTION = 100
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of opened mail backends, reused most-recently-first."""
+
+    def __init__(self, size=POOL_SIZE, max_messages=MAX_MESSAGES_PER_CONNECTION):
+        self.max_messages = max_messages
+        # LIFO keeps hitting the warmest connection; idle ones age out server-side
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    @contextmanager
+    def connection(self):
+        """Yield an open mail backend; return it to the pool if the send succeeded."""
+        backend = self._acquire()
+        try:
+            yield backend
+        except Exception:
+            self._close(backend)
+            raise
+        backend._pool_sent = getattr(backend, '_pool_sent', 0) + 1
+        self._release(backend)
+
+    def close_all(self):
+        while True:
+            try:
+                backend = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(backend)
+
+    # ---- internals ----
+
+    def _acquire(self):
+        while True:
+            try:
+                backend = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_alive(backend):
+                return backend
+            self._close(backend)
+
+        backend = get_connection(fail_silently=False)
+        backend.open()
+        return backend
+
+    def _release(self, backend):
+        if backend._pool_sent >= self.max_messages:
+            self._close(backend)
+            return
+        try:
+            self._idle.put_nowait(backend)
+        except queue.Full:
+            self._close(backend)
+
+    @staticmethod
+    def _is_alive(backend):
+        smtp = getattr(backend, 'connection', None)
+        if smtp is None:
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(backend):
+        try:
+            backend.close()
+        except Exception as e:
+            logger.debug("Error closing pooled mail connection: %s", e)
+
+
+pool = SMTPConnectionPool()
+atexit.register(pool.close_all)
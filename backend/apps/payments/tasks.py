@@ -0,0 +1,127 @@
+# FILE: /backend/apps/payments/tasks.py
+"""
+Celery tasks for payment notifications.
+
+- send_payment_failed_email:   Tells the customer a payment failed and lists the
+                               alternative payment methods. Queued from the
+                               Paystack views so SMTP never blocks the gateway
+                               response.
+"""
+import logging
+from smtplib import (
+    SMTPConnectError,
+    SMTPException,
+    SMTPResponseException,
+    SMTPServerDisconnected,
+)
+
+from celery import shared_task
+from celery.signals import worker_init
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import get_template, render_to_string
+
+from . import smtp_pool
+from .models import Payment
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_FAILED_TEMPLATES = (
+    'payments/email/payment_failed.txt',
+    'payments/email/payment_failed.html',
+)
+
+
+@worker_init.connect
+def _preload_email_templates(**kwargs):
+    """
+    Compile the email templates in the worker's main process, before the pool
+    forks, so every child (including ones recycled by worker_max_tasks_per_child)
+    inherits them from Django's cached loader instead of parsing on first send.
+    """
+    for name in PAYMENT_FAILED_TEMPLATES:
+        try:
+            get_template(name)
+        except Exception as e:
+            logger.warning("Could not preload email template %s: %s", name, e)
+
+
+def _build_payment_failed_email(payment):
+    """Return (subject, from_email, message, html_message) for a failed payment."""
+    subject = "Action Required: Your Payment Was Not Successful"
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com')
+
+    context = {
+        'user_name': payment.user.get_full_name() or payment.user.email,
+        'software_name': payment.software.name,
+        'amount': payment.amount,
+        'currency': payment.currency,
+        'payment_id': payment.id,
+        'site_url': getattr(settings, 'SITE_URL', '#'),
+    }
+    # Compiled templates are kept by Django's cached loader; only the context varies
+    text_template, html_template = PAYMENT_FAILED_TEMPLATES
+    message = render_to_string(text_template, context)
+    html_message = render_to_string(html_template, context)
+
+    return subject, from_email, message, html_message
+
+
+def _is_transient_smtp_error(exc):
+    """
+    True for failures worth retrying: dropped or refused connections, 4xx
+    replies and plain network errors. Permanent SMTP failures (5xx replies,
+    refused recipients, bad credentials) are not retried.
+    """
+    if isinstance(exc, (SMTPServerDisconnected, SMTPConnectError)):
+        return True
+    if isinstance(exc, SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    # SMTPException subclasses OSError; anything else SMTP-specific is permanent
+    return not isinstance(exc, SMTPException)
+
+
+@shared_task(bind=True, max_retries=3)
+def send_payment_failed_email(self, payment_id):
+    """
+    Send a professional email to the user when a payment attempt fails.
+    Suggests alternative payment methods (bank transfer, deposit, crypto).
+    Can be disabled via settings.SEND_PAYMENT_FAILED_EMAIL = False.
+    """
+    if not getattr(settings, 'SEND_PAYMENT_FAILED_EMAIL', True):
+        return
+
+    try:
+        payment = Payment.objects.select_related('user', 'software').get(id=payment_id)
+    except Payment.DoesNotExist:
+        logger.error("Payment %s not found for payment failure email", payment_id)
+        return
+
+    # Prevent sending duplicate emails if payment is no longer marked failed
+    if payment.status != Payment.Status.FAILED:
+        return
+
+    subject, from_email, message, html_message = _build_payment_failed_email(payment)
+
+    try:
+        with smtp_pool.pool.connection() as connection:
+            send_mail(
+                subject,
+                message,
+                from_email,
+                [payment.user.email],
+                html_message=html_message,
+                fail_silently=False,
+                connection=connection,
+            )
+    except OSError as e:
+        if not _is_transient_smtp_error(e):
+            raise
+        # Transient SMTP/network errors are retried with jittered exponential backoff
+        countdown = get_exponential_backoff_interval(
+            factor=1, retries=self.request.retries, maximum=600, full_jitter=True
+        )
+        raise self.retry(exc=e, countdown=countdown)
+
+    logger.info("Payment failure email sent to %s for payment %s", payment.user.email, payment.id)
@@ -0,0 +1,21 @@
+# FILE: /backend/apps/payments/tests/test_amounts.py
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from backend.apps.payments.views import from_minor, to_minor
+
+
+class MinorUnitConversionTestCase(SimpleTestCase):
+
+    def test_to_minor_matches_quantize(self):
+        """Integer conversion agrees with the previous quantize-based maths."""
+        for raw in ['0', '0.00', '1', '12.5', '12.50', '99.99', '1000000.01', '0.005', '0.015', '-3.20']:
+            amount = Decimal(raw)
+            expected = int(amount.quantize(Decimal('0.01')) * 100)
+            self.assertEqual(to_minor(amount), expected, raw)
+
+    def test_from_minor_round_trip(self):
+        """Minor units convert back to the same two-decimal amount."""
+        self.assertEqual(from_minor(1250), Decimal('12.50'))
+        self.assertEqual(from_minor(to_minor(Decimal('99.99'))), Decimal('99.99'))
@@ -0,0 +1,56 @@
+# FILE: /backend/apps/payments/tests/test_event_log.py
+import json
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from backend.apps.payments.encoders import ORJSONEncoder
+from backend.apps.payments.event_log import GatewayEventLogBuffer
+from backend.apps.payments.models import GatewayEventLog
+
+
+class GatewayEventLogBufferTestCase(TestCase):
+
+    def _log(self, buffer, payload_hash):
+        buffer.add(
+            gateway='paystack',
+            event_type='charge.success',
+            reference='ref-1',
+            payload={},
+            raw_payload='{}',
+            payload_hash=payload_hash,
+        )
+
+    def test_duplicate_payload_hash_is_ignored(self):
+        """Re-logging the same payload does not raise and keeps a single row."""
+        buffer = GatewayEventLogBuffer()
+
+        self._log(buffer, b'a' * 32)
+        self._log(buffer, b'a' * 32)
+        self._log(buffer, b'b' * 32)
+
+        self.assertEqual(GatewayEventLog.objects.count(), 2)
+
+    @override_settings(GATEWAY_EVENT_LOG_FLUSH_INTERVAL=60)
+    @patch.object(GatewayEventLogBuffer, '_ensure_flusher')
+    def test_full_buffer_writes_inline(self, _):
+        """Rows beyond max_buffered are written by the caller instead of being dropped."""
+        buffer = GatewayEventLogBuffer(max_buffered=1)
+
+        self._log(buffer, b'a' * 32)
+        self._log(buffer, b'b' * 32)
+
+        self.assertEqual(GatewayEventLog.objects.count(), 1)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(GatewayEventLog.objects.count(), 2)
+
+
+class ORJSONEncoderTestCase(SimpleTestCase):
+
+    def test_payload_round_trips_like_stdlib_json(self):
+        """The orjson-backed encoder produces JSON the stdlib reads back unchanged, big ints included."""
+        payload = {'event': 'charge.success', 'data': {'amount': 5000, 'ok': True, 'meta': None, 'big': 2 ** 70}}
+
+        encoded = json.dumps(payload, cls=ORJSONEncoder)
+
+        self.assertEqual(json.loads(encoded), payload)
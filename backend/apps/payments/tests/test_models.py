@@ -0,0 +1,29 @@
+# FILE: /backend/apps/payments/tests/test_models.py
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from backend.apps.payments.models import Payment
+from tests.factories import PaymentFactory
+
+
+class PaymentConstraintsTestCase(TestCase):
+
+    def test_one_pending_paystack_payment_per_user_and_software(self):
+        """A second pending Paystack checkout is rejected; other states and methods are not."""
+        payment = PaymentFactory(status=Payment.Status.PENDING, payment_method='PAYSTACK')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PaymentFactory(
+                user=payment.user, software=payment.software,
+                status=Payment.Status.PENDING, payment_method='PAYSTACK',
+            )
+
+        PaymentFactory(
+            user=payment.user, software=payment.software,
+            status=Payment.Status.FAILED, payment_method='PAYSTACK',
+        )
+        PaymentFactory(
+            user=payment.user, software=payment.software,
+            status=Payment.Status.PENDING, payment_method='BANK_TRANSFER',
+        )
+        self.assertEqual(Payment.objects.filter(user=payment.user).count(), 3)
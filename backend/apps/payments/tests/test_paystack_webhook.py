@@ -0,0 +1,223 @@
+# FILE: /backend/apps/payments/tests/test_paystack_webhook.py
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from backend.apps.payments import views
+from backend.apps.payments.models import Payment, WebhookEvent
+from tests.factories import PaymentFactory, SoftwareFactory
+
+TEST_SECRET = b'sk_test_secret'
+
+
+def _signed_request(payload):
+    body = json.dumps(payload).encode()
+    signature = hmac.new(TEST_SECRET, body, hashlib.sha512).hexdigest()
+    return APIRequestFactory().post(
+        '/api/v1/payments/webhook/paystack/',
+        data=body,
+        content_type='application/json',
+        HTTP_X_PAYSTACK_SIGNATURE=signature,
+    )
+
+
+class MaskSensitiveDataTestCase(SimpleTestCase):
+
+    def test_nested_fields_masked_without_mutating_input(self):
+        """Sensitive keys are redacted at any depth and the original payload is untouched."""
+        payload = {'event': 'charge.success', 'data': {'customer': {'email': 'a@b.c'}, 'meta': {'card': '4242'}}}
+
+        masked = views.mask_sensitive_data(payload)
+
+        self.assertEqual(masked['data']['customer'], '***REDACTED***')
+        self.assertEqual(masked['data']['meta']['card'], '***REDACTED***')
+        self.assertEqual(payload['data']['customer'], {'email': 'a@b.c'})
+        self.assertEqual(payload['data']['meta'], {'card': '4242'})
+
+    def test_dicts_inside_lists_masked(self):
+        """Sensitive keys nested in lists (e.g. custom_fields) are redacted without touching the input."""
+        payload = {'data': {'metadata': {'custom_fields': [{'account_number': '0123456789', 'value': 'x'}]}}}
+
+        masked = views.mask_sensitive_data(payload)
+
+        self.assertEqual(masked['data']['metadata']['custom_fields'][0], {'account_number': '***REDACTED***', 'value': 'x'})
+        self.assertEqual(payload['data']['metadata']['custom_fields'][0]['account_number'], '0123456789')
+
+
+@patch('backend.apps.payments.views._PAYSTACK_SECRET_BYTES', TEST_SECRET)
+class PaystackWebhookTestCase(TestCase):
+
+    def setUp(self):
+        self.view = views.PaystackWebhookView.as_view()
+
+    def test_invalid_signature_rejected(self):
+        """Requests signed with the wrong key are rejected."""
+        request = APIRequestFactory().post(
+            '/api/v1/payments/webhook/paystack/',
+            data=b'{"event": "charge.success"}',
+            content_type='application/json',
+            HTTP_X_PAYSTACK_SIGNATURE='bad',
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, 401)
+
+    def test_non_hex_signature_rejected(self):
+        """A garbage or non-ASCII signature header is a clean 401, not a server error."""
+        request = APIRequestFactory().post(
+            '/api/v1/payments/webhook/paystack/',
+            data=b'{"event": "charge.success"}',
+            content_type='application/json',
+            HTTP_X_PAYSTACK_SIGNATURE='zz\u00e9',
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, 401)
+
+    def test_oversized_content_length_rejected_before_reading_body(self):
+        """A declared length over the limit is refused without touching request.body."""
+        request = APIRequestFactory().post(
+            '/api/v1/payments/webhook/paystack/',
+            data=b'{}',
+            content_type='application/json',
+            CONTENT_LENGTH=str(views.MAX_WEBHOOK_SIZE + 1),
+        )
+        with patch.object(views.PaystackWebhookView, '_verify_signature') as mock_verify:
+            response = self.view(request)
+        self.assertEqual(response.status_code, 413)
+        mock_verify.assert_not_called()
+
+    def test_malformed_json_rejected(self):
+        """A correctly signed but unparsable body is rejected with 400."""
+        body = b'{"event": '
+        request = APIRequestFactory().post(
+            '/api/v1/payments/webhook/paystack/',
+            data=body,
+            content_type='application/json',
+            HTTP_X_PAYSTACK_SIGNATURE=hmac.new(TEST_SECRET, body, hashlib.sha512).hexdigest(),
+        )
+        response = self.view(request)
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicate_delivery_short_circuits(self):
+        """A replayed event is acknowledged without reprocessing."""
+        payload = {'event': 'transfer.success', 'data': {'id': 42, 'reference': 'ref-1'}}
+
+        first = self.view(_signed_request(payload))
+        self.assertEqual(first.data['status'], 'ignored')
+
+        second = self.view(_signed_request(payload))
+        self.assertEqual(second.data['status'], 'duplicate')
+        self.assertEqual(json.loads(second.render().content), {'status': 'duplicate'})
+        self.assertEqual(WebhookEvent.objects.filter(provider='paystack').count(), 1)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_identical_body_short_circuits_before_database(self):
+        """A repeated signed body is acknowledged from cache without touching the ledger."""
+        cache.clear()
+        payload = {'event': 'transfer.success', 'data': {'id': 43, 'reference': 'ref-2'}}
+
+        self.view(_signed_request(payload))
+        with self.assertNumQueries(0):
+            second = self.view(_signed_request(payload))
+
+        self.assertEqual(second.data['status'], 'duplicate')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @patch('backend.apps.payments.views._PAYSTACK_SESSION')
+    def test_final_verify_result_is_cached(self, mock_session):
+        """A terminal verify result is reused instead of calling Paystack again."""
+        cache.clear()
+        response = mock_session.get.return_value
+        response.status_code = 200
+        response.json.return_value = {
+            'status': True,
+            'data': {'status': 'success', 'amount': 5000, 'currency': 'NGN', 'customer': {'email': 'a@b.c'}},
+        }
+        view = views.PaystackWebhookView()
+
+        first = view._verify_with_gateway('ref-3')
+        second = view._verify_with_gateway('ref-3')
+
+        self.assertEqual(mock_session.get.call_count, 1)
+        self.assertEqual(second, {'status': 'success', 'amount': 5000, 'currency': 'NGN'})
+        self.assertEqual(first['amount'], second['amount'])
+
+    @patch.object(views.PaystackWebhookView, '_verify_with_gateway')
+    def test_charge_success_completes_payment(self, mock_verify):
+        """A verified charge.success marks the payment completed and records the charge id."""
+        payment = PaymentFactory(
+            status=Payment.Status.PENDING,
+            amount=Decimal('50.00'),
+            currency='NGN',
+            transaction_id='ref-ok',
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        mock_verify.return_value = {'status': 'success', 'amount': 5000, 'currency': 'NGN'}
+        payload = {
+            'event': 'charge.success',
+            'data': {'id': 77, 'reference': 'ref-ok', 'status': 'success', 'amount': 5000, 'currency': 'NGN'},
+        }
+
+        response = self.view(_signed_request(payload))
+
+        self.assertEqual(response.status_code, 200)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, Payment.Status.COMPLETED)
+        self.assertEqual(payment.metadata['paystack_charge_id'], 77)
+        self.assertIsNotNone(payment.completed_at)
+
+    @patch.object(views.PaystackWebhookView, '_verify_with_gateway')
+    def test_malformed_amount_rejected_without_server_error(self, mock_verify):
+        """Non-integer amounts get a 400 and keep the event claim instead of a retried 500."""
+        for index, amount in enumerate(['50.00', 49.5, None, 'abc']):
+            with self.subTest(amount=amount):
+                PaymentFactory(
+                    software=SoftwareFactory(slug=f'bad-amount-{index}'),
+                    status=Payment.Status.PENDING,
+                    amount=Decimal('50.00'),
+                    currency='NGN',
+                    transaction_id=f'ref-bad-{index}',
+                    expires_at=timezone.now() + timedelta(hours=1),
+                )
+                payload = {
+                    'event': 'charge.success',
+                    'data': {'id': 90 + index, 'reference': f'ref-bad-{index}', 'status': 'success',
+                             'amount': amount, 'currency': 'NGN'},
+                }
+                response = self.view(_signed_request(payload))
+                self.assertEqual(response.status_code, 400)
+                self.assertTrue(WebhookEvent.objects.filter(event_id=f'charge.success:{90 + index}').exists())
+        mock_verify.assert_not_called()
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @patch.object(views.PaystackWebhookView, '_verify_with_gateway')
+    def test_reference_claim_released_on_retryable_failure(self, mock_verify):
+        """A 503 frees the (event, reference) claim; a handled reference is then acknowledged from cache."""
+        cache.clear()
+        PaymentFactory(
+            status=Payment.Status.PENDING,
+            amount=Decimal('50.00'),
+            currency='NGN',
+            transaction_id='ref-lock',
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        data = {'reference': 'ref-lock', 'status': 'success', 'amount': 5000, 'currency': 'NGN'}
+
+        mock_verify.return_value = None
+        first = self.view(_signed_request({'event': 'charge.success', 'data': {'id': 80, **data}}))
+        self.assertEqual(first.status_code, 503)
+
+        mock_verify.return_value = {'status': 'success', 'amount': 5000, 'currency': 'NGN'}
+        second = self.view(_signed_request({'event': 'charge.success', 'data': {'id': 81, **data}}))
+        self.assertEqual(second.data['status'], 'success')
+
+        with self.assertNumQueries(0):
+            third = self.view(_signed_request({'event': 'charge.success', 'data': {'id': 82, **data}}))
+        self.assertEqual(third.data['status'], 'duplicate')
@@ -0,0 +1,75 @@
+# FILE: /backend/apps/payments/tests/test_tasks.py
+from smtplib import SMTPRecipientsRefused, SMTPResponseException, SMTPServerDisconnected
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.core import mail
+from django.test import SimpleTestCase, TestCase
+
+from backend.apps.payments.models import Payment
+from backend.apps.payments.smtp_pool import SMTPConnectionPool
+from backend.apps.payments.tasks import send_payment_failed_email
+from tests.factories import PaymentFactory
+
+
+class PaymentTasksTestCase(TestCase):
+
+    def test_send_payment_failed_email(self):
+        """A failed payment notifies the customer."""
+        payment = PaymentFactory(status=Payment.Status.FAILED)
+
+        send_payment_failed_email(str(payment.id))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [payment.user.email])
+        self.assertIn(str(payment.id), mail.outbox[0].body)
+
+    def test_send_payment_failed_email_skips_non_failed(self):
+        """No email is sent if the payment is no longer failed when the task runs."""
+        payment = PaymentFactory(status=Payment.Status.COMPLETED)
+
+        send_payment_failed_email(str(payment.id))
+
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_permanent_smtp_errors_are_not_retried(self):
+        """Refused recipients and 5xx replies fail at once instead of backing off."""
+        payment = PaymentFactory(status=Payment.Status.FAILED)
+        for exc in (
+            SMTPRecipientsRefused({payment.user.email: (550, b'no such user')}),
+            SMTPResponseException(554, b'rejected'),
+        ):
+            with self.subTest(exc=exc), \
+                    mock.patch('backend.apps.payments.tasks.send_mail', side_effect=exc), \
+                    mock.patch.object(send_payment_failed_email, 'retry') as retry:
+                with self.assertRaises(type(exc)):
+                    send_payment_failed_email(str(payment.id))
+                retry.assert_not_called()
+
+    def test_transient_smtp_errors_are_retried(self):
+        """Dropped connections and 4xx replies are retried."""
+        payment = PaymentFactory(status=Payment.Status.FAILED)
+        for exc in (SMTPServerDisconnected('gone'), SMTPResponseException(421, b'try later')):
+            with self.subTest(exc=exc), \
+                    mock.patch('backend.apps.payments.tasks.send_mail', side_effect=exc), \
+                    mock.patch.object(send_payment_failed_email, 'retry', side_effect=Retry()) as retry:
+                with self.assertRaises(Retry):
+                    send_payment_failed_email(str(payment.id))
+                self.assertIs(retry.call_args.kwargs['exc'], exc)
+
+
+class SMTPConnectionPoolTestCase(SimpleTestCase):
+
+    def test_connection_is_reused_until_recycled(self):
+        """Backends are returned to the pool and dropped after max_messages sends."""
+        pool = SMTPConnectionPool(size=2, max_messages=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        with pool.connection() as third:
+            pass
+
+        self.assertIs(first, second)
+        self.assertIsNot(second, third)
@@ -4,17 +4,25 @@ Payments views for Software Distribution Platform.
 from drf_spectacular.utils import extend_schema 
 import hashlib
 import hmac
+import itertools
 import json
 import logging
+import os
+import time
 import uuid
 from datetime import timedelta
 from decimal import Decimal
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from django.apps import apps
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import IntegrityError, transaction
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Func, JSONField, Q, Value
+from django.db.models.functions import Coalesce
 from django.template.loader import render_to_string
 from django.utils import timezone
 from rest_framework import serializers, status, viewsets, generics   # <-- added generics
@@ -26,15 +34,27 @@ from rest_framework.decorators import action
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 
+# Optional fast JSON codec – falls back to the stdlib if not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional Redis client for the webhook throttle – falls back to DRF's cache history
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
 from .models import (
     Coupon,
     CouponUsage,
-    GatewayEventLog,
     Invoice,
     OfflinePayment,
     Payment,
     Plan,                # added for PlanViewSet
     Subscription,
+    WebhookEvent,
 )
 from .serializers import (   # added serializers
     PaymentSerializer,
@@ -47,6 +67,9 @@ from .serializers import (   # added serializers
     OfflinePaymentRequestSerializer, # <-- new
     TransactionSerializer,           # <-- new for user transactions
 )
+from .event_log import event_log_buffer
+from .renderers import ORJSONRenderer
+from .tasks import send_payment_failed_email
 
 logger = logging.getLogger(__name__)
 
@@ -440,12 +463,150 @@ class PayPalWebhookView(APIView):
 # PAYSTACK INTEGRATION – unchanged (preserved in full)
 # ----------------------------------------------------------------------
 
-PAYSTACK_SUPPORTED_CURRENCIES = getattr(
+PAYSTACK_SUPPORTED_CURRENCIES = frozenset(getattr(
     settings, 'PAYSTACK_SUPPORTED_CURRENCIES',
     ["NGN", "USD", "GHS", "ZAR", "KES"]
-)
+))
+# Built once so the serializer field does not rebuild its choices per request
+_CURRENCY_CHOICES = tuple((c, c) for c in sorted(PAYSTACK_SUPPORTED_CURRENCIES))
 
 MAX_WEBHOOK_SIZE = getattr(settings, 'PAYSTACK_WEBHOOK_MAX_SIZE', 1024 * 100)  # 100KB default
+WEBHOOK_DEDUPE_TTL = 60 * 60 * 24  # Window for acknowledging identical webhook bodies from cache
+WEBHOOK_REFERENCE_LOCK_TTL = 60 * 60  # How long an (event, reference) pair stays claimed once handled
+_SHA512_HEX_LENGTH = hashlib.sha512().digest_size * 2
+VERIFY_CACHE_TTL = 300
+PAYSTACK_FINAL_VERIFY_STATUSES = frozenset({'success', 'failed', 'reversed'})
+
+# Secret-derived values are computed once at import (the key is fixed for the process lifetime).
+_PAYSTACK_SECRET_KEY = getattr(settings, 'PAYSTACK_SECRET_KEY', None) or ''
+_PAYSTACK_SECRET_BYTES = _PAYSTACK_SECRET_KEY.encode('utf-8')
+_PAYSTACK_AUTH_HEADER = f"Bearer {_PAYSTACK_SECRET_KEY}"
+_PAYSTACK_INITIALIZE_URL = "https://api.paystack.co/transaction/initialize"
+_PAYSTACK_VERIFY_URL = "https://api.paystack.co/transaction/verify/"
+# Connecting is fast when Paystack is reachable; don't let an unreachable host pin
+# a sync worker for the full read timeout on every retry.
+_PAYSTACK_CONNECT_TIMEOUT = 3.05
+
+
+def _build_paystack_session():
+    """
+    Process-wide keep-alive session for the Paystack API, shared by all threads.
+    Each endpoint keeps its own retry policy via a prefix-mounted adapter.
+    """
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": _PAYSTACK_AUTH_HEADER,
+        "Content-Type": "application/json",
+    })
+    session.mount(_PAYSTACK_INITIALIZE_URL, HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["POST"]
+        ),
+    ))
+    session.mount(_PAYSTACK_VERIFY_URL, HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=2,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False
+        ),
+    ))
+    return session
+
+
+_PAYSTACK_SESSION = _build_paystack_session()
+
+
+# Correlation IDs only need to be unique for log tracing, not unpredictable:
+# pid + import time + a per-process counter avoids an os.urandom() syscall per request.
+_CID_EPOCH = int(time.time())
+_CID_COUNTER = itertools.count()
+
+
+def _new_correlation_id() -> str:
+    return f"{os.getpid():x}-{_CID_EPOCH:x}-{next(_CID_COUNTER):x}"
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data):
+    """Parse JSON from bytes/str; raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _JSONBMerge(Func):
+    """
+    PostgreSQL top-level jsonb merge: COALESCE(field, '{}') || patch.
+    Same result as {**field, **patch} without reading the column into Python.
+    """
+    arg_joiner = ' || '
+    template = '(%(expressions)s)'
+    output_field = JSONField()
+
+    def __init__(self, expression, patch):
+        super().__init__(
+            Coalesce(expression, Value({}, output_field=JSONField())),
+            Value(patch, output_field=JSONField()),
+        )
+
+
+def to_minor(amount) -> int:
+    """
+    Convert a major-unit amount (e.g. Decimal('12.50')) to integer minor units (1250).
+    All supported Paystack currencies use 1/100 subunits. Works on the Decimal's
+    digit tuple with integer math; extra precision is rounded half-even like quantize().
+    """
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    sign, digits, exp = amount.as_tuple()
+    value = int(''.join(map(str, digits))) if digits else 0
+    shift = exp + 2
+    if shift >= 0:
+        value *= 10 ** shift
+    else:
+        divisor = 10 ** -shift
+        value, remainder = divmod(value, divisor)
+        if remainder * 2 > divisor or (remainder * 2 == divisor and value % 2):
+            value += 1
+    return -value if sign else value
+
+
+def parse_minor_amount(value):
+    """
+    Return a webhook amount (integer minor units) as int, or None if it is
+    missing or not a whole number: bools, fractional floats, non-numeric strings.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lstrip('-').isdigit():
+            return int(value)
+    return None
+
+
+def from_minor(minor) -> Decimal:
+    """Convert integer minor units (1250) back to a 2-dp major-unit Decimal (12.50)."""
+    return Decimal(int(minor)).scaleb(-2)
 
 
 class PaymentStatus:
@@ -458,133 +619,59 @@ class PaymentStatus:
     CANCELLED = "CANCELLED"
 
 
+_SENSITIVE_KEYS = frozenset({'email', 'customer', 'authorization', 'card', 'cvv', 'pin', 'account_number'})
+_REDACTED = '***REDACTED***'
+
+
 def mask_sensitive_data(payload):
-    """Remove sensitive fields from payload before logging."""
+    """
+    Remove sensitive fields from payload before logging.
+    Walks nested dicts and lists with an explicit stack and returns a masked
+    copy; the input is never mutated.
+    """
     if not isinstance(payload, dict):
         return payload
-    masked = payload.copy()
-    for key in ['email', 'customer', 'authorization', 'card']:
-        if key in masked:
-            masked[key] = '***REDACTED***'
-    if 'data' in masked and isinstance(masked['data'], dict):
-        masked['data'] = mask_sensitive_data(masked['data'])
+    masked = dict(payload)
+    stack = [masked]
+    while stack:
+        current = stack.pop()
+        entries = current.items() if isinstance(current, dict) else enumerate(current)
+        for key, value in entries:
+            # List indices are ints and never match a sensitive key
+            if key in _SENSITIVE_KEYS:
+                current[key] = _REDACTED
+            elif isinstance(value, (dict, list)):
+                # Copy before descending so the caller's nested containers stay intact
+                current[key] = value = type(value)(value)
+                stack.append(value)
     return masked
 
 
-def send_payment_failed_email(payment):
+def queue_payment_failed_email(payment):
     """
-    Send a professional email to the user when a payment attempt fails.
-    Suggests alternative payment methods (bank transfer, deposit, crypto).
-    Can be disabled via settings.SEND_PAYMENT_FAILED_EMAIL = False.
+    Hand the failed-payment email to Celery once the surrounding transaction
+    commits, so the worker sees the FAILED status and SMTP stays off the
+    request path. Can be disabled via settings.SEND_PAYMENT_FAILED_EMAIL = False.
     """
     if not getattr(settings, 'SEND_PAYMENT_FAILED_EMAIL', True):
         return
 
-    # Prevent sending duplicate emails if payment is already marked failed
-    if payment.status != PaymentStatus.FAILED:
-        return
-
-    subject = "Action Required: Your Payment Was Not Successful"
-    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com')
+    payment_id = str(payment.id)
 
-    # Plain text version (fallback and primary)
-    message = f"""
-Dear {payment.user.get_full_name() or payment.user.email},
-
-We noticed that your recent payment for **{payment.software.name}** 
-in the amount of **{payment.amount} {payment.currency}** was not successful.
-
-This could be due to insufficient funds, card restrictions, or a temporary 
-issue with your payment method.
-
-You can complete your purchase using one of the following alternative 
-payment methods:
-
-• **Bank Transfer**: Make a direct transfer to our corporate bank account. 
-  Please use your order number ({payment.id}) as reference and upload the 
-  receipt in your dashboard.
-
-• **Bank Deposit**: Deposit the exact amount at any branch of our partner 
-  banks. Instructions are available after selecting this method.
-
-• **Cryptocurrency (Bitcoin)**: Send the equivalent amount in Bitcoin to 
-  the address provided in your dashboard.
-
-To proceed, please visit your order dashboard or contact our support team 
-at support@example.com.
-
-We apologise for any inconvenience and are here to assist you.
-
-Best regards,
-The Software Distribution Platform Team
-"""
-
-    # HTML version – can be customised via templates if needed
-    html_message = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background-color: #f8f9fa; padding: 10px; text-align: center; }}
-        .footer {{ margin-top: 30px; font-size: 0.9em; color: #6c757d; }}
-        ul {{ list-style-type: none; padding-left: 0; }}
-        li {{ margin-bottom: 10px; padding-left: 20px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h2>Payment Issue – Alternative Methods Available</h2>
-        </div>
-        <p>Dear {payment.user.get_full_name() or payment.user.email},</p>
-        <p>We noticed that your recent payment for <strong>{payment.software.name}</strong><br>
-        in the amount of <strong>{payment.amount} {payment.currency}</strong> was not successful.</p>
-        <p>This could be due to insufficient funds, card restrictions, or a temporary issue with your payment method.</p>
-        <p><strong>You can complete your purchase using one of the following alternative payment methods:</strong></p>
-        <ul>
-            <li>✅ <strong>Bank Transfer</strong> – Direct transfer to our corporate bank account.<br>
-                <small>Use order reference <code>{payment.id}</code> and upload the receipt in your dashboard.</small>
-            </li>
-            <li>✅ <strong>Bank Deposit</strong> – Deposit the exact amount at any branch of our partner banks.<br>
-                <small>Instructions available after selecting this method.</small>
-            </li>
-            <li>✅ <strong>Cryptocurrency (Bitcoin)</strong> – Send the equivalent amount in Bitcoin.<br>
-                <small>Address provided in your dashboard.</small>
-            </li>
-        </ul>
-        <p>To proceed, please visit your <a href="{getattr(settings, 'SITE_URL', '#')}/dashboard">order dashboard</a> or contact our support team at <a href="mailto:support@example.com">support@example.com</a>.</p>
-        <p>We apologise for any inconvenience and are here to assist you.</p>
-        <p>Best regards,<br>The Software Distribution Platform Team</p>
-        <div class="footer">
-            <p>This is an automated message, please do not reply directly.</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
+    def _enqueue():
+        try:
+            send_payment_failed_email.delay(payment_id)
+        except Exception as e:
+            logger.exception("Failed to queue payment failure email for payment %s: %s", payment_id, e)
 
-    try:
-        send_mail(
-            subject,
-            message,
-            from_email,
-            [payment.user.email],
-            html_message=html_message,
-            fail_silently=True,
-        )
-        logger.info(f"Payment failure email sent to {payment.user.email} for payment {payment.id}")
-    except Exception as e:
-        logger.exception(f"Failed to send payment failure email: {e}")
+    transaction.on_commit(_enqueue)
 
 
 class PaystackInitSerializer(serializers.Serializer):
     """Validate Paystack initialisation requests."""
     software_id = serializers.UUIDField()
     currency = serializers.ChoiceField(
-        choices=PAYSTACK_SUPPORTED_CURRENCIES,
+        choices=_CURRENCY_CHOICES,
         default="NGN"
     )
     coupon_code = serializers.CharField(required=False, allow_blank=True)
@@ -618,6 +705,7 @@ class InitializePaystackPaymentView(APIView):
     - Sends email notification on payment failure.
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer]
 
     def post(self, request):
         # 1. Input validation
@@ -642,85 +730,73 @@ class InitializePaystackPaymentView(APIView):
         discount_amount = Decimal('0.00')
 
         if coupon_code:
-            try:
-                coupon = Coupon.objects.get(code=coupon_code, is_active=True)
-                if coupon.is_valid and coupon.can_be_used_by_v2(request.user):
-                    discount_amount = coupon.calculate_discount(base_price)
-                    final_amount = base_price - discount_amount
-                else:
-                    return Response(
-                        {'coupon_error': 'Coupon is invalid or cannot be used by this user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            except Coupon.DoesNotExist:
+            # One round-trip: the caller's usage count is annotated onto the coupon,
+            # so validity and the per-user limit are checked without further queries.
+            coupon = Coupon.objects.filter(code=coupon_code, is_active=True).annotate(
+                user_usage_count=Count('usages', filter=Q(usages__user=request.user))
+            ).first()
+            if coupon is None:
                 return Response(
                     {'coupon_error': 'Coupon does not exist.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            if coupon.is_valid and coupon.user_usage_count < coupon.max_uses_per_user:
+                discount_amount = coupon.calculate_discount(base_price)
+                final_amount = base_price - discount_amount
+            else:
+                return Response(
+                    {'coupon_error': 'Coupon is invalid or cannot be used by this user.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
         if final_amount < 0:
             final_amount = Decimal('0.00')
 
-        # 4. Prevent duplicate pending payments – use row‑level locking to avoid race
+        # 4–5. Atomic creation of payment (coupon usage is recorded tentatively).
+        # Duplicate pending inits for the same user/software are rejected by the
+        # uniq_pending_paystack_payment partial index – no row lock, no EXISTS probe.
+        # The primary key is generated client-side, so the Paystack reference and
+        # metadata are known before the INSERT and the row is written once.
+        payment = Payment(
+            user=request.user,
+            software=software,
+            amount=final_amount,
+            currency=currency,
+            payment_method="PAYSTACK",
+            status=PaymentStatus.PENDING,
+        )
+        # transaction_id is the internal UUID (used as the Paystack reference)
+        payment.transaction_id = str(payment.id)
+        payment.metadata = {
+            'base_price': str(base_price),
+            'discount': str(discount_amount),
+            'coupon_code': coupon_code if coupon else None,
+            **payment.get_paystack_metadata(),
+        }
+
         with transaction.atomic():
-            # Lock the user row to prevent concurrent init for same user/software
-            user = request.user.__class__.objects.select_for_update().get(pk=request.user.pk)
-            existing_pending = Payment.objects.filter(
-                user=user,
-                software=software,
-                payment_method="PAYSTACK",
-                status=PaymentStatus.PENDING
-            ).exists()
-            if existing_pending:
+            try:
+                with transaction.atomic():
+                    payment.save(force_insert=True)
+            except IntegrityError:
                 return Response(
                     {'error': 'You already have a pending payment for this software.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # 5. Atomic creation of payment (coupon usage is recorded tentatively)
-            payment = Payment.objects.create(
-                user=user,
-                software=software,
-                amount=final_amount,
-                currency=currency,
-                payment_method="PAYSTACK",
-                status=PaymentStatus.PENDING,
-                metadata={
-                    'base_price': str(base_price),
-                    'discount': str(discount_amount),
-                    'coupon_code': coupon_code if coupon else None,
-                }
-            )
-
-            # Set transaction_id to internal UUID (will be used as Paystack reference)
-            payment.transaction_id = str(payment.id)
-            payment.metadata = {**(payment.metadata or {}), **payment.get_paystack_metadata()}
-            payment.save(update_fields=['transaction_id', 'metadata'])
-
-            # Tentatively record coupon usage (will be rolled back if gateway fails)
+            # Tentatively record coupon usage (will be rolled back if gateway fails).
+            # apply_usage re-checks the limits under the coupon row lock; if a concurrent
+            # init used the last slot, discard this payment rather than discount it.
             if coupon and discount_amount > 0:
-                coupon.apply_usage(request.user, payment=payment)
+                if not coupon.apply_usage(request.user, payment=payment):
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'coupon_error': 'Coupon is invalid or cannot be used by this user.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
 
         # 6. Call Paystack API with robust retry logic
         try:
-            import requests
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
-
-            session = requests.Session()
-            retries = Retry(
-                total=3,
-                backoff_factor=1,
-                status_forcelist=[500, 502, 503, 504],
-                allowed_methods=["POST"]
-            )
-            session.mount('https://', HTTPAdapter(max_retries=retries))
-
-            paystack_url = "https://api.paystack.co/transaction/initialize"
-            headers = {
-                "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-                "Content-Type": "application/json",
-            }
             domain_url = getattr(settings, 'DOMAIN_URL', None)
             if not domain_url:
                 domain_url = f"{request.scheme}://{request.get_host()}"
@@ -728,16 +804,18 @@ class InitializePaystackPaymentView(APIView):
 
             payload = {
                 "email": request.user.email,
-                "amount": int((payment.amount.quantize(Decimal('0.01')) * 100)),
+                "amount": to_minor(payment.amount),
                 "currency": payment.currency,
                 "reference": payment.transaction_id,
                 "metadata": payment.metadata,
                 "callback_url": f"{domain_url}/payments/verify",
             }
 
-            response = session.post(paystack_url, json=payload, headers=headers, timeout=15)
+            # Serialize once: urllib3 retries re-send the same buffer instead of re-encoding the dict
+            body = _json_dumps(payload)
+            response = _PAYSTACK_SESSION.post(_PAYSTACK_INITIALIZE_URL, data=body, timeout=(_PAYSTACK_CONNECT_TIMEOUT, 15))
             try:
-                res_data = response.json()
+                res_data = _json_loads(response.content)
             except ValueError:
                 raise Exception("Invalid JSON response from Paystack")
 
@@ -747,8 +825,8 @@ class InitializePaystackPaymentView(APIView):
                     with transaction.atomic():
                         CouponUsage.objects.filter(payment=payment).delete()
                         payment.mark_failed(reason="Paystack reference mismatch")
-                        send_payment_failed_email(payment)  # <-- Email notification
-                    logger.error(f"Paystack reference mismatch: expected {payment.transaction_id}, got {returned_ref}")
+                        queue_payment_failed_email(payment)  # <-- Email notification
+                    logger.error("Paystack reference mismatch: expected %s, got %s", payment.transaction_id, returned_ref)
                     return Response(
                         {'error': 'Payment gateway integrity error.'},
                         status=status.HTTP_502_BAD_GATEWAY
@@ -765,25 +843,19 @@ class InitializePaystackPaymentView(APIView):
                 with transaction.atomic():
                     CouponUsage.objects.filter(payment=payment).delete()
                     payment.mark_failed(reason=f"Paystack init failed: {error_msg}")
-                    send_payment_failed_email(payment)  # <-- Email notification
-                logger.error(f"Paystack initialization error: {res_data}")
+                    queue_payment_failed_email(payment)  # <-- Email notification
+                logger.error("Paystack initialization error: %s", res_data)
                 return Response(
                     {'error': 'Payment gateway error, please try again.'},
                     status=status.HTTP_502_BAD_GATEWAY
                 )
 
-        except ImportError:
-            logger.critical("requests library not installed – cannot initialize Paystack.")
-            return Response(
-                {'error': 'Payment service unavailable.'},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
         except Exception as e:
-            logger.exception(f"Paystack API call failed: {str(e)}")
+            logger.exception("Paystack API call failed: %s", e)
             with transaction.atomic():
                 CouponUsage.objects.filter(payment=payment).delete()
                 payment.mark_failed(reason="Paystack init network error")
-                send_payment_failed_email(payment)  # <-- Email notification
+                queue_payment_failed_email(payment)  # <-- Email notification
             return Response(
                 {'error': 'Payment gateway communication failed.'},
                 status=status.HTTP_502_BAD_GATEWAY
@@ -802,10 +874,88 @@ class PaystackBankTransferView(APIView):
         return Response({'status': 'PaystackBankTransferView placeholder'})
 
 
+# Sliding-window log: one sorted-set member per accepted request, scored by ms timestamp.
+# Returns {allowed, retry_after_ms}.
+_THROTTLE_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, tonumber(oldest[2]) + window - now}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, 0}
+"""
+_throttle_script = None
+
+_THROTTLE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _parse_throttle_rate(rate):
+    """Parse '<requests>/<period>' into (num_requests, duration_seconds), like DRF."""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), _THROTTLE_PERIODS[period[0]]
+
+
 class PaystackWebhookThrottle(AnonRateThrottle):
-    """Rate limit for unauthenticated webhook endpoints."""
+    """
+    Rate limit for unauthenticated webhook endpoints.
+    Uses a sliding window kept in a Redis sorted set and evaluated atomically
+    by a registered Lua script (EVALSHA, one round-trip), so the limit holds
+    across app servers without fixed-window bursts at the boundary. Falls back
+    to DRF's cache-based history when the default cache is not django-redis.
+    """
     rate = getattr(settings, 'PAYSTACK_WEBHOOK_THROTTLE_RATE', '100/hour')
 
+    def __init__(self):
+        super().__init__()
+        self._retry_after = None
+
+    def parse_rate(self, rate):
+        return _parse_throttle_rate(rate)
+
+    def allow_request(self, request, view):
+        global _throttle_script
+        if self.num_requests is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        if get_redis_connection is None:
+            return super().allow_request(request, view)
+        try:
+            conn = get_redis_connection('default')
+        except NotImplementedError:
+            return super().allow_request(request, view)
+        try:
+            if _throttle_script is None:
+                _throttle_script = conn.register_script(_THROTTLE_LUA)
+            window_ms = self.duration * 1000
+            allowed, retry_after_ms = _throttle_script(
+                keys=[f"thr:pswh:{self.key}"],
+                # Random member: pid/start-time based ids collide across replicas
+                args=[int(time.time() * 1000), window_ms, self.num_requests, uuid.uuid4().hex],
+                client=conn,
+            )
+        except Exception as e:
+            # Fail open: webhooks are still signature-verified downstream
+            logger.warning("Paystack webhook throttle unavailable: %s", e)
+            return True
+        if allowed:
+            return True
+        self._retry_after = max(retry_after_ms, 0) / 1000
+        return False
+
+    def wait(self):
+        if self._retry_after is not None:
+            return self._retry_after
+        return super().wait()
+
 
 class PaystackWebhookView(APIView):
     """
@@ -824,6 +974,11 @@ class PaystackWebhookView(APIView):
     """
     permission_classes = [AllowAny]
     throttle_classes = [PaystackWebhookThrottle]
+    # The raw body is parsed once by the handler (after HMAC check); DRF never parses it.
+    parser_classes = []
+    renderer_classes = [ORJSONRenderer]
+    # SHA-256 of the current request body, set once by post()
+    _body_digest = None
 
     # IP allowlist is disabled by default. To use, set PAYSTACK_WEBHOOK_ALLOWED_IPS in settings
     # and ensure you are behind a trusted proxy with proper configuration.
@@ -841,37 +996,35 @@ class PaystackWebhookView(APIView):
 
     def _verify_signature(self, raw_body: bytes, signature: str) -> bool:
         """Verify x-paystack-signature header using raw body (timing-safe)."""
-        if not signature:
+        if not signature or not _PAYSTACK_SECRET_BYTES:
+            return False
+        # Reject wrong-length headers before hashing up to MAX_WEBHOOK_SIZE bytes
+        if len(signature) != _SHA512_HEX_LENGTH:
+            return False
+        try:
+            provided = bytes.fromhex(signature)
+        except ValueError:
             return False
-        secret = settings.PAYSTACK_SECRET_KEY.encode('utf-8')
-        expected = hmac.new(secret, raw_body, hashlib.sha512).hexdigest()
-        return hmac.compare_digest(expected, signature)
+        # Compare raw 64-byte digests: no hex encoding of our side, and a
+        # malformed or non-ASCII header can't raise inside compare_digest.
+        expected = hmac.digest(_PAYSTACK_SECRET_BYTES, raw_body, 'sha512')
+        return hmac.compare_digest(expected, provided)
 
     def _verify_with_gateway(self, reference: str) -> dict:
         """
         Call Paystack transaction verify endpoint with retry and backoff.
         Raises exception only after all retries fail (transient errors will be retried).
+        Final outcomes are cached briefly so redelivered events skip the HTTPS call.
         """
-        import requests
-        from requests.adapters import HTTPAdapter
-        from urllib3.util.retry import Retry
-
-        session = requests.Session()
-        retries = Retry(
-            total=3,
-            backoff_factor=2,
-            status_forcelist=[500, 502, 503, 504],
-            allowed_methods=["GET"],
-            raise_on_status=False
-        )
-        session.mount('https://', HTTPAdapter(max_retries=retries))
+        cache_key = f"pstk:verify:{reference}"
+        try:
+            cached = cache.get(cache_key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return cached
 
-        headers = {
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json",
-        }
-        url = f"https://api.paystack.co/transaction/verify/{reference}"
-        response = session.get(url, headers=headers, timeout=10)
+        response = _PAYSTACK_SESSION.get(f"{_PAYSTACK_VERIFY_URL}{reference}", timeout=(_PAYSTACK_CONNECT_TIMEOUT, 10))
         if response.status_code >= 500:
             # Let webhook retry; do not raise here – we'll return None and let caller decide.
             return None
@@ -879,34 +1032,101 @@ class PaystackWebhookView(APIView):
         data = response.json()
         if not data.get('status'):
             raise Exception(f"Paystack verify returned error: {data.get('message')}")
-        return data['data']
+
+        verify_data = data['data']
+        # Only terminal statuses are safe to reuse; keep just the fields we check
+        if verify_data.get('status') in PAYSTACK_FINAL_VERIFY_STATUSES:
+            summary = {key: verify_data.get(key) for key in ('status', 'amount', 'currency')}
+            try:
+                cache.set(cache_key, summary, timeout=VERIFY_CACHE_TTL)
+            except Exception as e:
+                logger.warning("Failed to cache Paystack verify result for %s: %s", reference, e)
+        return verify_data
 
     def _mask_sensitive_data(self, payload):
         return mask_sensitive_data(payload)
 
+    def _claim_event(self, event, data):
+        """
+        Record the event in the WebhookEvent ledger.
+        Returns the new row, None if the payload carries no event id,
+        or False if the event was already received.
+        """
+        event_id = data.get('id') if isinstance(data, dict) else None
+        if event_id is None:
+            return None
+        try:
+            with transaction.atomic():
+                return WebhookEvent.objects.create(
+                    provider='paystack',
+                    event_id=f"{event}:{event_id}"[:100],
+                )
+        except IntegrityError:
+            return False
+
+    def _claim_payload(self, body_digest):
+        """
+        SET NX the body's SHA-256 digest in the cache.
+        Returns the cache key if claimed, None if the cache is unavailable,
+        or False if the same body was received within WEBHOOK_DEDUPE_TTL.
+        """
+        return self._claim_key(f"pstk:evt:{body_digest.hex()}", WEBHOOK_DEDUPE_TTL)
+
+    def _claim_reference(self, event, reference):
+        """
+        SET NX the (event, reference) pair in the cache, so concurrent or retried
+        deliveries for one payment never queue on its row lock.
+        Same return values as _claim_payload.
+        """
+        return self._claim_key(f"pstk:ref:{event}:{reference}", WEBHOOK_REFERENCE_LOCK_TTL)
+
+    def _claim_key(self, key, timeout):
+        try:
+            return key if cache.add(key, 1, timeout=timeout) else False
+        except Exception as e:
+            logger.warning("Paystack webhook dedupe cache unavailable: %s", e)
+            return None
+
+    def _release_payload(self, key):
+        if not key:
+            return
+        try:
+            cache.delete(key)
+        except Exception as e:
+            logger.warning("Failed to release Paystack webhook dedupe key %s: %s", key, e)
+
     def post(self, request):
         # 0. Correlation ID for tracing
-        correlation_id = request.headers.get('X-Request-ID', str(uuid.uuid4()))
-        logger.info(f"[{correlation_id}] Paystack webhook received")
+        correlation_id = request.headers.get('X-Request-ID') or _new_correlation_id()
+        logger.info("[%s] Paystack webhook received", correlation_id)
 
         # 1. IP allowlist (if configured) – only safe with proper proxy setup.
         if not self._verify_ip(request):
-            logger.warning(f"[{correlation_id}] Paystack webhook from unauthorised IP: {request.META.get('REMOTE_ADDR')}")
+            logger.warning("[%s] Paystack webhook from unauthorised IP: %s", correlation_id, request.META.get('REMOTE_ADDR'))
             return Response({'error': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
 
         # 2. Content-Type check
         if request.content_type != 'application/json':
-            logger.warning(f"[{correlation_id}] Paystack webhook with invalid content type: {request.content_type}")
+            logger.warning("[%s] Paystack webhook with invalid content type: %s", correlation_id, request.content_type)
             return Response({'error': 'Unsupported Media Type'}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
 
-        # 3. Payload size limit
+        # 3. Payload size limit – the declared length is checked before the body is read
+        try:
+            declared_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            declared_length = 0
+        if declared_length > MAX_WEBHOOK_SIZE:
+            logger.error("[%s] Paystack webhook payload too large: %s bytes declared", correlation_id, declared_length)
+            return Response({'error': 'Payload too large'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
         raw_body = request.body
         if len(raw_body) > MAX_WEBHOOK_SIZE:
-            logger.error(f"[{correlation_id}] Paystack webhook payload too large: {len(raw_body)} bytes")
-            return Response({'error': 'Payload too large'}, status=status.HTTP_413_PAYLOAD_TOO_LARGE)
+            logger.error("[%s] Paystack webhook payload too large: %s bytes", correlation_id, len(raw_body))
+            return Response({'error': 'Payload too large'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
         # 4. Signature verification using raw body
         signature = request.headers.get('x-paystack-signature', '')
+        # Unsigned/forged bodies are rejected before any hashing beyond the HMAC;
+        # _log_event hashes the body itself on this path
         if not self._verify_signature(raw_body, signature):
             self._log_event(
                 event_type=None,
@@ -919,10 +1139,31 @@ class PaystackWebhookView(APIView):
             )
             return Response({'error': 'Invalid signature'}, status=status.HTTP_401_UNAUTHORIZED)
 
+        # SHA-256 of the signed body, computed once: keys the edge dedupe and the audit log row
+        self._body_digest = hashlib.sha256(raw_body).digest()
+
+        # 4b. Edge dedupe – an identical signed body seen recently is acknowledged
+        # with a single cache round-trip, before any parsing or database work.
+        payload_key = self._claim_payload(self._body_digest)
+        if payload_key is False:
+            logger.info("[%s] Paystack webhook duplicate payload", correlation_id)
+            return Response({'status': 'duplicate'})
+
+        try:
+            response = self._handle_verified(raw_body, correlation_id)
+        except Exception:
+            self._release_payload(payload_key)
+            raise
+        # Let Paystack's retry through when we failed on our side
+        if response.status_code >= 500:
+            self._release_payload(payload_key)
+        return response
+
+    def _handle_verified(self, raw_body, correlation_id):
         # 5. Parse JSON safely
         try:
-            payload = json.loads(raw_body)
-        except json.JSONDecodeError:
+            payload = _json_loads(raw_body)
+        except ValueError:  # orjson.JSONDecodeError, json.JSONDecodeError and bad UTF-8 all subclass it
             self._log_event(
                 event_type=None,
                 reference=None,
@@ -936,26 +1177,44 @@ class PaystackWebhookView(APIView):
 
         event = payload.get('event')
         data = payload.get('data', {})
+        reference = data.get('reference')
+
+        # 5a. Per-reference guard – a delivery for a payment already being (or
+        # recently) handled is acknowledged before any database work.
+        reference_key = None
+        if event in ['charge.success', 'charge.failed'] and reference:
+            reference_key = self._claim_reference(event, reference)
+            if reference_key is False:
+                logger.info("[%s] Paystack webhook duplicate reference: %s %s", correlation_id, event, reference)
+                return Response({'status': 'duplicate'})
+
+        # 5b. Replay dedupe – one unique-index INSERT before any further work
+        webhook_event = self._claim_event(event, data)
+        if webhook_event is False:
+            logger.info("[%s] Paystack webhook duplicate delivery: %s %s", correlation_id, event, data.get('id'))
+            return Response({'status': 'duplicate'})
+
+        # Masked once here; every remaining exit path logs the same copy
+        masked_payload = self._mask_sensitive_data(payload)
 
         # 6. Event type filtering
         if event not in ['charge.success', 'charge.failed']:
-            logger.info(f"[{correlation_id}] Paystack webhook ignored: {event}")
+            logger.info("[%s] Paystack webhook ignored: %s", correlation_id, event)
             self._log_event(
                 event_type=event,
-                reference=data.get('reference'),
-                payload=self._mask_sensitive_data(payload),
+                reference=reference,
+                payload=masked_payload,
                 status_code=200,
                 raw_payload=raw_body,
                 correlation_id=correlation_id
             )
             return Response({'status': 'ignored'})
 
-        reference = data.get('reference')
         if not reference:
             self._log_event(
                 event_type=event,
                 reference=None,
-                payload=self._mask_sensitive_data(payload),
+                payload=masked_payload,
                 status_code=400,
                 error='Missing reference',
                 raw_payload=raw_body,
@@ -968,13 +1227,66 @@ class PaystackWebhookView(APIView):
         final_error = None
 
         try:
+            # 7a. Lock-free idempotency probe on the unique transaction_id index.
+            # Paystack retries delivered events aggressively; finalised payments
+            # are acknowledged without taking a row lock.
+            current_status = Payment.objects.filter(
+                transaction_id=reference
+            ).values_list('status', flat=True).first()
+            if current_status is None:
+                raise Payment.DoesNotExist
+            if current_status in (PaymentStatus.COMPLETED, PaymentStatus.FAILED):
+                logger.info("[%s] Paystack webhook: payment %s already %s", correlation_id, reference, current_status)
+                return Response({'status': 'already_processed'})
+
+            # 7b. Verify with Paystack API (defence in depth) before opening the
+            # transaction, so the HTTPS round-trip never holds a row lock or keeps
+            # a transaction open. Do NOT fail payment on transient error.
+            verify_data = None
+            if event == 'charge.success':
+                raw_amount = parse_minor_amount(data.get('amount'))
+                if raw_amount is None:
+                    logger.error("[%s] Paystack webhook: invalid amount %r for %s",
+                                 correlation_id, data.get('amount'), reference)
+                    final_status_code = 400
+                    final_error = "Invalid amount"
+                    return Response({'error': 'Invalid amount'}, status=status.HTTP_400_BAD_REQUEST)
+                verify_data = self._verify_with_gateway(reference)
+                if verify_data is None:
+                    # Verification temporarily unavailable; return 503 to trigger webhook retry
+                    logger.warning("[%s] Paystack webhook: verification unavailable for payment %s, will retry", correlation_id, reference)
+                    final_status_code = 503
+                    final_error = "Verification temporarily unavailable"
+                    return Response(
+                        {'error': 'Verification service unavailable, please retry'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE
+                    )
+
             with transaction.atomic():
-                # 7. Lookup payment by reference (requires unique transaction_id in DB)
-                payment = Payment.objects.select_for_update().get(transaction_id=reference)
+                # 7. Lookup payment by reference (requires unique transaction_id in DB).
+                # Only the columns this handler reads are fetched; user is joined for
+                # the email check and only the payment row is locked. SKIP LOCKED makes
+                # a concurrent delivery for the same reference fail fast instead of queueing.
+                try:
+                    payment = Payment.objects.select_for_update(
+                        of=('self',), skip_locked=True
+                    ).select_related('user').only(
+                        'id', 'status', 'amount', 'currency',
+                        'transaction_id', 'created_at', 'expires_at', 'user__email',
+                    ).get(transaction_id=reference)
+                except Payment.DoesNotExist:
+                    # The row exists (7a) but is locked by another delivery: ask Paystack to retry
+                    logger.info("[%s] Paystack webhook: payment %s busy, deferring", correlation_id, reference)
+                    final_status_code = 503
+                    final_error = "Payment is being processed by another delivery"
+                    return Response(
+                        {'error': 'Payment is being processed, please retry'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE
+                    )
 
-                # 8. Idempotency – skip if already finalised
+                # 8. Idempotency – re-check under the lock (status may have changed since 7a)
                 if payment.status in [PaymentStatus.COMPLETED, PaymentStatus.FAILED]:
-                    logger.info(f"[{correlation_id}] Paystack webhook: payment {payment.id} already {payment.status}")
+                    logger.info("[%s] Paystack webhook: payment %s already %s", correlation_id, payment.id, payment.status)
                     return Response({'status': 'already_processed'})
 
                 # 9. Payment age check – only for PENDING payments, using expires_at if available
@@ -982,8 +1294,8 @@ class PaystackWebhookView(APIView):
                     expiry = getattr(payment, 'expires_at', payment.created_at + timedelta(hours=24))
                     if timezone.now() > expiry:
                         payment.mark_failed(reason="Webhook received after expiry")
-                        send_payment_failed_email(payment)  # <-- Email notification
-                        logger.error(f"[{correlation_id}] Paystack webhook: payment {payment.id} expired")
+                        queue_payment_failed_email(payment)  # <-- Email notification
+                        logger.error("[%s] Paystack webhook: payment %s expired", correlation_id, payment.id)
                         final_status_code = 400
                         final_error = "Payment expired"
                         return Response({'error': 'Payment expired'}, status=status.HTTP_400_BAD_REQUEST)
@@ -992,8 +1304,8 @@ class PaystackWebhookView(APIView):
                 charged_currency = data.get('currency')
                 if charged_currency != payment.currency:
                     payment.mark_failed(reason=f"Currency mismatch: expected {payment.currency}, got {charged_currency}")
-                    send_payment_failed_email(payment)  # <-- Email notification
-                    logger.error(f"[{correlation_id}] Paystack webhook: currency mismatch for payment {payment.id}")
+                    queue_payment_failed_email(payment)  # <-- Email notification
+                    logger.error("[%s] Paystack webhook: currency mismatch for payment %s", correlation_id, payment.id)
                     final_status_code = 400
                     final_error = "Currency mismatch"
                     return Response({'error': 'Currency mismatch'}, status=status.HTTP_400_BAD_REQUEST)
@@ -1001,106 +1313,114 @@ class PaystackWebhookView(APIView):
                 # 11. Email verification – log mismatch but do NOT fail
                 customer_email = data.get('customer', {}).get('email')
                 if customer_email and customer_email != payment.user.email:
-                    logger.warning(f"[{correlation_id}] Paystack webhook: email mismatch for payment {payment.id}. "
-                                   f"Expected {payment.user.email}, got {customer_email}")
+                    logger.warning("[%s] Paystack webhook: email mismatch for payment %s. Expected %s, got %s",
+                                   correlation_id, payment.id, payment.user.email, customer_email)
                     payment.status_reason = f"Email mismatch: {customer_email}"
                     payment.save(update_fields=['status_reason'])
 
                 # 12. Amount verification with tolerance (allow 1 cent difference)
                 if event == 'charge.success':
-                    raw_amount = data.get('amount')
-                    if raw_amount is None:
-                        raise ValueError("Missing amount in webhook payload")
-                    charged_amount = Decimal(str(raw_amount)) / 100
-                    if abs(charged_amount - payment.amount) > Decimal('0.01'):
+                    # Compare in integer minor units (kobo/cents); tolerance is one minor unit
+                    expected_minor = to_minor(payment.amount)
+                    if abs(raw_amount - expected_minor) > 1:
                         payment.mark_failed(
-                            reason=f"Amount mismatch: expected {payment.amount}, got {charged_amount}"
+                            reason=f"Amount mismatch: expected {payment.amount}, got {from_minor(raw_amount)}"
                         )
-                        send_payment_failed_email(payment)  # <-- Email notification
-                        logger.error(f"[{correlation_id}] Paystack webhook: amount mismatch for payment {payment.id}")
+                        queue_payment_failed_email(payment)  # <-- Email notification
+                        logger.error("[%s] Paystack webhook: amount mismatch for payment %s", correlation_id, payment.id)
                         final_status_code = 400
                         final_error = "Amount mismatch"
                         return Response({'error': 'Amount mismatch'}, status=status.HTTP_400_BAD_REQUEST)
 
-                    # 13. Verify with Paystack API (defence in depth) – with retry, do NOT fail payment on transient error
-                    verify_data = self._verify_with_gateway(reference)
-                    if verify_data is None:
-                        # Verification temporarily unavailable; return 500 to trigger webhook retry
-                        logger.warning(f"[{correlation_id}] Paystack webhook: verification unavailable for payment {payment.id}, will retry")
-                        final_status_code = 503
-                        final_error = "Verification temporarily unavailable"
-                        return Response(
-                            {'error': 'Verification service unavailable, please retry'},
-                            status=status.HTTP_503_SERVICE_UNAVAILABLE
-                        )
-
-                    # Verify transaction status and integrity
-                    if verify_data.get('status') != 'success':
-                        payment.mark_failed(reason=f"Gateway verify status: {verify_data.get('status')}")
-                        send_payment_failed_email(payment)  # <-- Email notification
-                        logger.error(f"[{correlation_id}] Paystack webhook: verification failed for payment {payment.id}")
+                    # 13. Verify transaction status and integrity (fetched in 7b)
+                    verify_status = verify_data.get('status')
+                    if verify_status != 'success':
+                        payment.mark_failed(reason=f"Gateway verify status: {verify_status}")
+                        queue_payment_failed_email(payment)  # <-- Email notification
+                        logger.error("[%s] Paystack webhook: verification failed for payment %s", correlation_id, payment.id)
                         final_status_code = 400
                         final_error = "Verification failed"
                         return Response({'error': 'Verification failed'}, status=status.HTTP_400_BAD_REQUEST)
 
                     # Additional consistency checks
-                    if Decimal(str(verify_data.get('amount', 0))) / 100 != payment.amount:
-                        logger.error(f"[{correlation_id}] Paystack webhook: verified amount mismatch for payment {payment.id}")
+                    if int(verify_data.get('amount') or 0) != expected_minor:
+                        logger.error("[%s] Paystack webhook: verified amount mismatch for payment %s", correlation_id, payment.id)
                         # Do NOT mark failed – log only, discrepancy may be due to rounding
                     if verify_data.get('currency') != payment.currency:
-                        logger.error(f"[{correlation_id}] Paystack webhook: verified currency mismatch for payment {payment.id}")
+                        logger.error("[%s] Paystack webhook: verified currency mismatch for payment %s", correlation_id, payment.id)
 
                     # 14. Verify that data['status'] == 'success'
-                    if data.get('status') != 'success':
-                        payment.mark_failed(reason=f"Unexpected charge status: {data.get('status')}")
-                        send_payment_failed_email(payment)  # <-- Email notification
-                        logger.error(f"[{correlation_id}] Paystack webhook: charge status is not success for payment {payment.id}")
+                    charge_status = data.get('status')
+                    if charge_status != 'success':
+                        payment.mark_failed(reason=f"Unexpected charge status: {charge_status}")
+                        queue_payment_failed_email(payment)  # <-- Email notification
+                        logger.error("[%s] Paystack webhook: charge status is not success for payment %s", correlation_id, payment.id)
                         final_status_code = 400
                         final_error = "Charge not successful"
                         return Response({'error': 'Charge not successful'}, status=status.HTTP_400_BAD_REQUEST)
 
                 # 15. Process event
                 if event == 'charge.success':
-                    # Safely update metadata
-                    new_metadata = {**(payment.metadata or {})}
-                    new_metadata['paystack_charge_id'] = data.get('id')
-                    new_metadata['paystack_transaction_date'] = data.get('transaction_date')
-                    payment.metadata = new_metadata
-                    payment.save(update_fields=['metadata'])
-
-                    payment.mark_completed(
-                        transaction_id=reference,
-                        gateway_reference=reference
-                    )
-                    logger.info(f"[{correlation_id}] Paystack payment completed: {payment.id}, ref: {reference}")
+                    metadata_patch = {
+                        'paystack_charge_id': data.get('id'),
+                        'paystack_transaction_date': data.get('transaction_date'),
+                    }
+
+                    # Row is already locked above, so metadata and completion go out
+                    # as one UPDATE instead of save() + mark_completed()'s re-lock and save.
+                    now = timezone.now()
+                    completed_fields = {
+                        'status': Payment.Status.COMPLETED,
+                        'transaction_id': reference,
+                        'gateway_reference': reference,
+                        'completed_at': now,
+                        'updated_at': now,
+                    }
+                    if connection.vendor == 'postgresql':
+                        # Merge server-side; metadata is never read into Python
+                        Payment.objects.filter(pk=payment.pk).update(
+                            metadata=_JSONBMerge(F('metadata'), metadata_patch), **completed_fields
+                        )
+                    else:
+                        completed_fields['metadata'] = {**(payment.metadata or {}), **metadata_patch}
+                        Payment.objects.filter(pk=payment.pk).update(**completed_fields)
+                    for field, value in completed_fields.items():
+                        setattr(payment, field, value)
+                    logger.info("[%s] Paystack payment completed: %s, ref: %s", correlation_id, payment.id, reference)
 
                 elif event == 'charge.failed':
                     failure_message = data.get('gateway_response', 'Payment failed')
                     payment.mark_failed(reason=f"Paystack: {failure_message}")
-                    send_payment_failed_email(payment)  # <-- Email notification
-                    logger.info(f"[{correlation_id}] Paystack payment failed: {payment.id}, ref: {reference}")
+                    queue_payment_failed_email(payment)  # <-- Email notification
+                    logger.info("[%s] Paystack payment failed: %s, ref: %s", correlation_id, payment.id, reference)
 
         except Payment.DoesNotExist:
             final_status_code = 404
             final_error = f"Payment with transaction_id={reference} not found"
-            logger.error(f"[{correlation_id}] Paystack webhook: {final_error}")
+            logger.error("[%s] Paystack webhook: %s", correlation_id, final_error)
             return Response({'error': 'Payment not found'}, status=status.HTTP_404_NOT_FOUND)
         except Payment.MultipleObjectsReturned:
             final_status_code = 409
             final_error = f"Multiple payments with transaction_id={reference}"
-            logger.error(f"[{correlation_id}] Paystack webhook: {final_error}. DB uniqueness required.")
+            logger.error("[%s] Paystack webhook: %s. DB uniqueness required.", correlation_id, final_error)
             return Response({'error': 'Duplicate transaction ID'}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             final_status_code = 500
             final_error = str(e)
-            logger.exception(f"[{correlation_id}] Paystack webhook error: {e}")
+            logger.exception("[%s] Paystack webhook error: %s", correlation_id, e)
             return Response({'error': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         finally:
+            # Release the dedupe claim on retryable failures so Paystack's retry is processed
+            if final_status_code >= 500:
+                if webhook_event:
+                    webhook_event.delete()
+                self._release_payload(reference_key)
+
             # 16. Log event AFTER processing with final outcome
             self._log_event(
                 event_type=event,
                 reference=reference,
-                payload=self._mask_sensitive_data(payload),
+                payload=masked_payload,
                 status_code=final_status_code,
                 error=final_error,
                 raw_payload=raw_body,
@@ -1110,23 +1430,23 @@ class PaystackWebhookView(APIView):
         return Response({'status': 'success'}, status=status.HTTP_200_OK)
 
     def _log_event(self, event_type, reference, payload, status_code, error=None, raw_payload=None, correlation_id=None):
-        """Create immutable audit log of webhook event with deduplication."""
+        """Queue immutable audit log of webhook event; duplicates are dropped on insert."""
         try:
-            # Generate payload hash for deduplication (unique constraint on DB)
-            payload_hash = hashlib.sha256(raw_payload).hexdigest() if raw_payload else None
-            GatewayEventLog.objects.create(
+            # Payload hash for deduplication (unique constraint on DB); post() hashes
+            # signed bodies once and later log paths reuse that digest.
+            payload_hash = self._body_digest
+            if payload_hash is None:
+                payload_hash = hashlib.sha256(raw_payload).digest() if raw_payload else b''
+            event_log_buffer.add(
                 gateway='paystack',
                 event_type=event_type,
                 reference=reference,
                 payload=payload,          # Masked parsed payload
-                raw_payload=raw_payload,  # Raw bytes for forensic replay
+                raw_payload=raw_payload.decode('utf-8', 'replace') if raw_payload else '',  # For forensic replay
                 status_code=status_code,
                 error_message=str(error) if error else '',
-                correlation_id=correlation_id,
+                correlation_id=correlation_id or '',
                 payload_hash=payload_hash,
             )
-        except IntegrityError:
-            # Duplicate event – ignore (already logged)
-            logger.debug(f"Duplicate webhook event detected: {payload_hash}")
         except Exception as e:
-            logger.exception(f"Failed to log Paystack webhook: {e}")
\ No newline at end of file
+            logger.exception("Failed to log Paystack webhook: %s", e)
\ No newline at end of file
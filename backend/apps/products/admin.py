@@ -1,5 +1,9 @@
 # FILE: /backend/apps/products/admin.py
+import hashlib
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
 from django.db.models import Count, Prefetch
 from django.utils.html import format_html
 from django.urls import reverse
@@ -7,6 +11,15 @@ from django.utils.http import urlencode
 
 from .models import Category, Software, SoftwareVersion, SoftwareImage, SoftwareDocument
 
+# Signed storage URLs (S3 query-string auth) expire; refresh well before they do
+_PREVIEW_URL_TTL = max(getattr(settings, 'AWS_QUERYSTRING_EXPIRE', 3600) - 300, 60)
+
+
+def _preview_url(image):
+    """Storage URL for an image field, cached by file name so each changelist row doesn't re-sign it."""
+    key = f"admin:img:{hashlib.sha1(image.name.encode()).hexdigest()}"
+    return cache.get_or_set(key, lambda: image.url, _PREVIEW_URL_TTL)
+
 
 # ----------------------------------------------------------------------
 # Inlines – for better UX under SoftwareAdmin
@@ -34,7 +47,7 @@ class SoftwareImageInline(admin.TabularInline):
         if obj.image:
             return format_html(
                 '<img src="{}" width="80" height="80" style="object-fit: cover;" />',
-                obj.image.url
+                _preview_url(obj.image)
             )
         return "No image"
     image_preview.short_description = 'Preview'
@@ -56,6 +69,8 @@ class SoftwareDocumentInline(admin.TabularInline):
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'parent', 'display_order', 'is_active', 'software_count')
+    # parent is nullable, so the changelist's default select_related() would skip it
+    list_select_related = ('parent',)
     list_filter = ('is_active', 'parent')
     search_fields = ('name', 'slug', 'description')
     prepopulated_fields = {'slug': ('name',)}
@@ -82,6 +97,10 @@ class CategoryAdmin(admin.ModelAdmin):
 class SoftwareAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'app_code', 'category', 'base_price', 'currency',
                     'is_active', 'is_featured', 'download_count', 'created_at')
+    # category is nullable, so the changelist's default select_related() would skip it
+    list_select_related = ('category',)
+    # Skip the second, unfiltered COUNT(*) on filtered changelists
+    show_full_result_count = False
     list_filter = ('is_active', 'is_featured', 'is_new', 'category', 'license_type')
     search_fields = ('name', 'slug', 'app_code', 'short_description')
     prepopulated_fields = {'slug': ('name',)}
@@ -139,6 +158,8 @@ class SoftwareAdmin(admin.ModelAdmin):
 class SoftwareVersionAdmin(admin.ModelAdmin):
     list_display = ('software', 'version_number', 'version_code', 'is_active', 'is_beta',
                     'is_stable', 'download_count', 'released_at')
+    list_select_related = ('software',)
+    show_full_result_count = False
     list_filter = ('is_active', 'is_beta', 'is_stable', 'is_signed', 'software')
     search_fields = ('version_number', 'version_code', 'release_name', 'release_notes')
     readonly_fields = ('binary_size', 'binary_checksum', 'download_count', 'created_at', 'updated_at')
@@ -196,6 +217,8 @@ class SoftwareVersionAdmin(admin.ModelAdmin):
 @admin.register(SoftwareImage)
 class SoftwareImageAdmin(admin.ModelAdmin):
     list_display = ('software', 'image_type', 'display_order', 'is_active', 'image_preview')
+    list_select_related = ('software',)
+    show_full_result_count = False
     list_filter = ('image_type', 'is_active', 'software')
     readonly_fields = ('image_preview', 'created_at')
 
@@ -203,7 +226,7 @@ class SoftwareImageAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" width="100" height="100" style="object-fit: cover;" />',
-                obj.image.url
+                _preview_url(obj.image)
             )
         return "No image"
     image_preview.short_description = 'Preview'
@@ -216,6 +239,8 @@ class SoftwareImageAdmin(admin.ModelAdmin):
 class SoftwareDocumentAdmin(admin.ModelAdmin):
     list_display = ('software', 'document_type', 'title', 'language', 'version',
                     'download_count', 'is_active')
+    list_select_related = ('software',)
+    show_full_result_count = False
     list_filter = ('document_type', 'language', 'is_active', 'software')
     search_fields = ('title', 'description')
     readonly_fields = ('download_count', 'created_at', 'updated_at')
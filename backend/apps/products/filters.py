@@ -5,7 +5,10 @@ Provides clean, declarative filtering for the Software API.
 All changes are backward‑compatible and non‑disruptive.
 """
 import django_filters
-from .models import Software
+from django.db import connection
+from django.db.models import Exists, OuterRef
+
+from .models import Software, SoftwareVersion
 
 
 class SoftwareFilter(django_filters.FilterSet):
@@ -16,12 +19,13 @@ class SoftwareFilter(django_filters.FilterSet):
     OpenAPI documentation, and separation of concerns.
 
     ⚠️ Performance & Correctness Notes:
-    - The `os` filter uses `icontains` on `versions__supported_os` (a JSON list).
-      This requires a JOIN and will cause duplicate rows in the queryset unless
-      `.distinct()` is applied. The view must (and does) call `.distinct()`.
-    - For large datasets, consider normalizing `supported_os` into a ManyToMany
-      relation or a Postgres ArrayField with GIN index for efficient `overlap`
-      lookups. This filter is a placeholder that works but may become a bottleneck.
+    - The `os` filter matches an exact OS name in `versions__supported_os_normalized`
+      (a lowercased copy of `supported_os`). On PostgreSQL this is JSONB
+      containment (`@>`), served by the `sv_supported_os_norm_gin` index; other
+      backends fall back to `icontains`. It is an EXISTS subquery, so no JOIN
+      duplicates and no `.distinct()`.
+    - The `tag` filter is JSONB containment on `tags` on PostgreSQL, served by
+      the `software_tags_pathops_gin` index; other backends use `icontains`.
     - Price filters rely on `base_price`; ensure a database index exists on this
       field for range‑scan performance.
     """
@@ -34,10 +38,13 @@ class SoftwareFilter(django_filters.FilterSet):
         lookup_expr='lte'
     )
     os = django_filters.CharFilter(
-        field_name="versions__supported_os",
-        lookup_expr='icontains',          # case‑insensitive, more user‑friendly
+        method='filter_os',
         help_text="Filter by operating system (e.g., 'windows', 'linux', 'macos')"
     )
+    tag = django_filters.CharFilter(
+        method='filter_tag',
+        help_text="Filter by tag (exact, case-sensitive)"
+    )
     category = django_filters.CharFilter(
         field_name="category__slug",
         lookup_expr='exact',
@@ -56,13 +63,27 @@ class SoftwareFilter(django_filters.FilterSet):
             'min_price',
             'max_price',
             'os',
+            'tag',
         ]
 
-    def filter_queryset(self, queryset):
+    def filter_os(self, queryset, name, value):
         """
-        Ensure the filtered queryset is distinct, eliminating duplicates
-        introduced by the `versions` JOIN. This makes the filter self‑contained
-        and safe even if the view forgets to call `.distinct()`.
+        Case-insensitive exact match against the lowercased supported_os copies.
+        A correlated EXISTS never multiplies Software rows, so no DISTINCT is
+        needed on the listing or on the paginator's COUNT(*).
         """
-        queryset = super().filter_queryset(queryset)
-        return queryset.distinct()
\ No newline at end of file
+        value = value.strip().lower()
+        if connection.vendor == 'postgresql':
+            versions = SoftwareVersion.objects.filter(supported_os_normalized__contains=[value])
+        else:
+            # JSON containment is unsupported on SQLite/Oracle
+            versions = SoftwareVersion.objects.filter(supported_os_normalized__icontains=value)
+        return queryset.filter(Exists(versions.filter(software=OuterRef('pk'))))
+
+    def filter_tag(self, queryset, name, value):
+        """Match software whose `tags` list contains the given tag."""
+        value = value.strip()
+        if connection.vendor == 'postgresql':
+            return queryset.filter(tags__contains=[value])
+        # JSON containment is unsupported on SQLite/Oracle
+        return queryset.filter(tags__icontains=value)
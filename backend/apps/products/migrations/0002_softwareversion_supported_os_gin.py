@@ -0,0 +1,50 @@
+# Generated by Django 4.2.28 on 2026-10-17 17:20
+
+from django.db import migrations
+
+GIN_INDEX = "sv_supported_os_gin"
+
+
+def lowercase_supported_os(apps, schema_editor):
+    SoftwareVersion = apps.get_model("products", "SoftwareVersion")
+    batch = []
+    for version in SoftwareVersion.objects.only("id", "supported_os").iterator(chunk_size=2000):
+        if not isinstance(version.supported_os, list):
+            continue
+        normalized = [e.strip().lower() if isinstance(e, str) else e for e in version.supported_os]
+        if normalized != version.supported_os:
+            version.supported_os = normalized
+            batch.append(version)
+        if len(batch) >= 2000:
+            SoftwareVersion.objects.bulk_update(batch, ["supported_os"])
+            batch = []
+    if batch:
+        SoftwareVersion.objects.bulk_update(batch, ["supported_os"])
+
+
+def create_gin_index(apps, schema_editor):
+    # jsonb_path_ops GIN only exists on PostgreSQL; other backends keep the scan
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON products_softwareversion "
+        "USING gin (supported_os jsonb_path_ops)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_supported_os, migrations.RunPython.noop),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.28 on 2026-10-17 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_softwareversion_supported_os_gin"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="softwareversion",
+            name="checksum_status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("READY", "Ready"),
+                    ("FAILED", "Failed"),
+                ],
+                default="READY",
+                editable=False,
+                help_text="PENDING while the binary is being hashed in the background",
+                max_length=10,
+                verbose_name="checksum status",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.28 on 2026-10-17 18:40
+
+from django.db import migrations
+
+GIN_INDEX = "software_tags_pathops_gin"
+
+
+def create_gin_index(apps, schema_editor):
+    # jsonb_path_ops GIN only exists on PostgreSQL; other backends keep the scan
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON products_software "
+        "USING gin (tags jsonb_path_ops)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_softwareversion_checksum_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.28 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0004_software_tags_gin"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="software",
+            index=models.Index(
+                fields=["is_active", "display_order", "name"], name="software_list_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="software",
+            index=models.Index(
+                fields=["category", "is_active", "display_order"],
+                name="software_cat_list_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="softwareversion",
+            index=models.Index(
+                fields=[
+                    "software",
+                    "is_active",
+                    "is_beta",
+                    "-version_major",
+                    "-version_minor",
+                    "-version_patch",
+                ],
+                name="version_latest_idx",
+            ),
+        ),
+    ]
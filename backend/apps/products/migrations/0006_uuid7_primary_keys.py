@@ -0,0 +1,34 @@
+# Generated by Django 4.2.28 on 2026-10-17 19:40
+
+import backend.apps.products.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_software_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="software",
+            name="id",
+            field=models.UUIDField(
+                default=backend.apps.products.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="softwareversion",
+            name="id",
+            field=models.UUIDField(
+                default=backend.apps.products.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
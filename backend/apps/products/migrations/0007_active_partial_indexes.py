@@ -0,0 +1,62 @@
+# Generated by Django 4.2.28 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="software",
+            name="software_list_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="software",
+            name="software_cat_list_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="softwareversion",
+            name="version_latest_idx",
+        ),
+        migrations.AddIndex(
+            model_name="software",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["display_order", "name"],
+                name="sw_active_list_part",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="software",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["is_featured", "display_order"],
+                name="sw_active_featured_part",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="software",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["category", "display_order"],
+                name="sw_active_cat_part",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="softwareversion",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("is_beta", False)),
+                fields=[
+                    "software",
+                    "-version_major",
+                    "-version_minor",
+                    "-version_patch",
+                ],
+                name="sv_active_latest_part",
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.28 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+OLD_GIN_INDEX = "sv_supported_os_gin"
+GIN_INDEX = "sv_supported_os_norm_gin"
+
+
+def fill_supported_os_normalized(apps, schema_editor):
+    # supported_os is kept as entered from here on; rows lowercased by 0002
+    # stay lowercased, only the filter copy is derived here
+    SoftwareVersion = apps.get_model("products", "SoftwareVersion")
+    batch = []
+    for version in SoftwareVersion.objects.only("id", "supported_os").iterator(chunk_size=2000):
+        if not isinstance(version.supported_os, list):
+            continue
+        version.supported_os_normalized = [
+            e.strip().lower() if isinstance(e, str) else e for e in version.supported_os
+        ]
+        batch.append(version)
+        if len(batch) >= 2000:
+            SoftwareVersion.objects.bulk_update(batch, ["supported_os_normalized"])
+            batch = []
+    if batch:
+        SoftwareVersion.objects.bulk_update(batch, ["supported_os_normalized"])
+
+
+def move_gin_index(apps, schema_editor):
+    # jsonb_path_ops GIN only exists on PostgreSQL; other backends keep the scan
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {OLD_GIN_INDEX}")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON products_softwareversion "
+        "USING gin (supported_os_normalized jsonb_path_ops)"
+    )
+
+
+def restore_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {OLD_GIN_INDEX} ON products_softwareversion "
+        "USING gin (supported_os jsonb_path_ops)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_active_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="softwareversion",
+            name="supported_os_normalized",
+            field=models.JSONField(
+                default=list,
+                editable=False,
+                help_text="Lowercased copy of supported_os used by the OS filter",
+                verbose_name="supported OS (normalized)",
+            ),
+        ),
+        migrations.RunPython(fill_supported_os_normalized, migrations.RunPython.noop),
+        migrations.RunPython(move_gin_index, restore_gin_index),
+    ]
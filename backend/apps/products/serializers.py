@@ -167,14 +167,14 @@ class SoftwareVersionSerializer(serializers.ModelSerializer):
             'id', 'software', 'version_number', 'version_code',
             'release_name', 'release_notes', 'changelog',
             'binary_file', 'binary_size', 'file_size_human',
-            'binary_checksum', 'installer_file',
+            'binary_checksum', 'checksum_status', 'installer_file',
             'download_url', 'download_count',
             'supported_os', 'min_requirements', 'recommended_requirements',
             'is_active', 'is_beta', 'is_stable', 'is_signed',
             'signature_file', 'created_at', 'updated_at', 'released_at'
         ]
         read_only_fields = [
-            'id', 'binary_size', 'binary_checksum',
+            'id', 'binary_size', 'binary_checksum', 'checksum_status',
             'download_count', 'created_at', 'updated_at'
         ]
         validators = [
@@ -324,11 +324,10 @@ class SoftwareSerializer(serializers.ModelSerializer):
     def get_current_version(self, obj):
         """
         Returns the current stable version of the software.
-        Note: This method triggers a database query per object.
-        Ensure your view uses prefetch_related or select_related
-        to avoid N+1 queries.
+        Note: This method triggers a database query per object unless
+        the view uses prefetch_related(Software.LATEST_VERSION_PREFETCH).
         """
-        version = obj.get_latest_version(include_beta=False)
+        version = obj.current_version
         if version:
             return SoftwareVersionSerializer(version, context=self.context).data
         return None
@@ -11,6 +11,7 @@ from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from .models import Software, SoftwareVersion
+from .tasks import compute_version_checksum
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +23,10 @@ def _binary_file_changed(instance):
     """Return True if the binary_file field differs from the saved state."""
     if not instance.pk:
         return bool(instance.binary_file)  # new instance with file
-    try:
-        old = SoftwareVersion.objects.get(pk=instance.pk)
-        return old.binary_file != instance.binary_file
-    except SoftwareVersion.DoesNotExist:
+    old_name = SoftwareVersion.objects.filter(pk=instance.pk).values_list('binary_file', flat=True).first()
+    if old_name is None:
         return bool(instance.binary_file)
+    return old_name != (instance.binary_file.name or '')
 
 
 # ----------------------------------------------------------------------
@@ -35,22 +35,40 @@ def _binary_file_changed(instance):
 @receiver(pre_save, sender=SoftwareVersion)
 def update_binary_metadata(sender, instance, **kwargs):
     """
-    Update binary size and SHA‑256 checksum when the binary file changes.
-    This replaces two separate signals with a single, efficient handler.
-    - Only runs when the file actually changes (not on every save).
-    - Does NOT block on large files (still synchronous; see comment below).
+    Update binary size and schedule the SHA‑256 checksum when the binary file changes.
+    - Only runs when the file actually changes (not on every save), and not
+      at all for update_fields saves that leave binary_file out.
+    - Uploads received through upload.checksum_upload_handlers already carry
+      their SHA-256; it is stored as-is.
+    - Otherwise hashing runs in a Celery task after commit, so large uploads
+      don't hold the request worker or the transaction open; checksum_status
+      is PENDING until it completes.
     """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'binary_file' not in update_fields:
+        return
     if _binary_file_changed(instance):
-        # Update file size from the uploaded file
         if instance.binary_file:
+            # Update file size from the uploaded file
             instance.binary_size = instance.binary_file.size
-            # Recalculate checksum only if it's missing or file changed
-            # (Calculate even if checksum already exists, because new file)
-            instance.binary_checksum = instance.calculate_checksum()
+
+            # Hashed while streaming in (see upload.py): no need to read it back
+            streamed_digest = getattr(getattr(instance.binary_file, '_file', None), 'sha256', None)
+            if streamed_digest:
+                instance.binary_checksum = streamed_digest
+                instance.checksum_status = SoftwareVersion.ChecksumStatus.READY
+                return
+
+            instance.binary_checksum = ''
+            instance.checksum_status = SoftwareVersion.ChecksumStatus.PENDING
+
+            version_id = str(instance.pk)
+            transaction.on_commit(lambda: compute_version_checksum.delay(version_id))
         else:
             # File was removed – clear size and checksum
             instance.binary_size = 0
             instance.binary_checksum = ''
+            instance.checksum_status = SoftwareVersion.ChecksumStatus.READY
 
 
 # ----------------------------------------------------------------------
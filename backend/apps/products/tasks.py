@@ -0,0 +1,61 @@
+# FILE: /backend/apps/products/tasks.py
+"""
+Celery tasks for software products.
+
+- compute_version_checksum:   Hashes an uploaded SoftwareVersion binary off the
+                              request thread and records the SHA-256 checksum.
+- flush_download_counts:      Drains Redis-buffered download counters into the
+                              database (beat, every minute).
+"""
+import logging
+
+from celery import shared_task
+
+from .counters import flush_download_counts as flush_buffered_downloads
+from .models import Software, SoftwareDocument, SoftwareVersion
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def compute_version_checksum(self, version_id):
+    """
+    Compute and store the SHA-256 of a version's binary.
+    The write is a queryset update guarded on the file name, so it neither
+    re-enters save()/signals nor overwrites the checksum of a newer upload.
+    """
+    try:
+        version = SoftwareVersion.objects.only('id', 'binary_file').get(pk=version_id)
+    except SoftwareVersion.DoesNotExist:
+        logger.warning("SoftwareVersion %s not found for checksum", version_id)
+        return
+    if not version.binary_file:
+        return
+
+    file_name = version.binary_file.name
+    try:
+        with version.binary_file.open('rb'):
+            checksum = version.calculate_checksum()
+    except OSError as e:
+        if self.request.retries >= self.max_retries:
+            logger.error("Checksum failed for SoftwareVersion %s: %s", version_id, e)
+            SoftwareVersion.objects.filter(pk=version_id, binary_file=file_name).update(
+                checksum_status=SoftwareVersion.ChecksumStatus.FAILED
+            )
+            return
+        raise self.retry(exc=e)
+
+    SoftwareVersion.objects.filter(pk=version_id, binary_file=file_name).update(
+        binary_checksum=checksum,
+        checksum_status=SoftwareVersion.ChecksumStatus.READY,
+    )
+    return checksum
+
+
+@shared_task
+def flush_download_counts():
+    """Apply buffered Redis download counters to the download_count columns."""
+    flushed = flush_buffered_downloads([Software, SoftwareVersion, SoftwareDocument])
+    if flushed:
+        logger.info("Flushed %d buffered downloads", flushed)
+    return flushed
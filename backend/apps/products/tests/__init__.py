@@ -0,0 +1 @@
+# This file makes the tests directory a Python package.
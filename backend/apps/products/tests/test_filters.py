@@ -0,0 +1,26 @@
+# FILE: /backend/apps/products/tests/test_filters.py
+from django.test import TestCase
+
+from backend.apps.products.filters import SoftwareFilter
+from backend.apps.products.models import Software
+from tests.factories import SoftwareFactory, SoftwareVersionFactory
+
+
+class SoftwareFilterTestCase(TestCase):
+
+    def test_tag_filter_matches_listed_tag(self):
+        tagged = SoftwareFactory(slug='tagged-tool', tags=['security', 'backup'])
+        SoftwareFactory(slug='other-tool', tags=['office'])
+
+        result = SoftwareFilter({'tag': 'backup'}, queryset=Software.objects.all()).qs
+        self.assertEqual(list(result), [tagged])
+
+    def test_os_filter_is_case_insensitive_and_keeps_display_casing(self):
+        windows = SoftwareFactory(slug='windows-tool')
+        version = SoftwareVersionFactory(software=windows, supported_os=['Windows', 'macOS'])
+        SoftwareVersionFactory(software=SoftwareFactory(slug='linux-tool'), supported_os=['Linux'])
+
+        result = SoftwareFilter({'os': 'MACOS'}, queryset=Software.objects.all()).qs
+        self.assertEqual(list(result), [windows])
+        version.refresh_from_db()
+        self.assertEqual(version.supported_os, ['Windows', 'macOS'])
@@ -0,0 +1,122 @@
+# FILE: /backend/apps/products/tests/test_models.py
+from django.test import TestCase
+
+from backend.apps.products.counters import apply_download_counts, record_download
+from backend.apps.products.models import Category, Software, SoftwareVersion
+from tests.factories import SoftwareFactory, SoftwareVersionFactory
+
+
+class CategorySoftwareCountTestCase(TestCase):
+
+    def test_annotated_count_needs_no_extra_queries(self):
+        """with_software_count() counts active software in the list query itself."""
+        category = Category.objects.create(name='Tools', slug='tools')
+        SoftwareFactory(category=category, slug='active-tool')
+        SoftwareFactory(category=category, slug='retired-tool', is_active=False)
+
+        categories = list(Category.objects.with_software_count())
+        with self.assertNumQueries(0):
+            self.assertEqual(categories[0].software_count, 1)
+
+        self.assertEqual(Category.objects.get(pk=category.pk).software_count, 1)
+
+
+class SoftwareLatestVersionTestCase(TestCase):
+
+    def test_prefetched_latest_version_needs_no_extra_queries(self):
+        """LATEST_VERSION_PREFETCH serves get_latest_version without a query per software."""
+        software = SoftwareFactory(slug='prefetched-tool')
+        SoftwareVersionFactory(software=software, version_number='1.9.0')
+        SoftwareVersionFactory(software=software, version_number='1.10.0')
+        SoftwareVersionFactory(software=software, version_number='2.0.0', is_beta=True)
+        SoftwareVersionFactory(software=software, version_number='3.0.0', is_active=False)
+
+        with self.assertNumQueries(2):
+            items = list(Software.objects.prefetch_related(Software.LATEST_VERSION_PREFETCH))
+        with self.assertNumQueries(0):
+            self.assertEqual(items[0].current_version.version_number, '1.10.0')
+
+        self.assertEqual(software.get_latest_version(include_beta=True).version_number, '2.0.0')
+
+    def test_supported_os_uses_prefetched_versions(self):
+        """get_supported_os_list reads prefetched versions and memoises the result."""
+        software = SoftwareFactory(slug='os-tool')
+        SoftwareVersionFactory(software=software, supported_os=['windows', 'linux'])
+        SoftwareVersionFactory(software=software, supported_os=['linux', 'macos'])
+        SoftwareVersionFactory(software=software, supported_os=['android'], is_active=False)
+
+        item = Software.objects.prefetch_related('versions').get(pk=software.pk)
+        with self.assertNumQueries(0):
+            self.assertCountEqual(item.get_supported_os_list(), ['windows', 'linux', 'macos'])
+
+        fresh = Software.objects.get(pk=software.pk)
+        with self.assertNumQueries(1):
+            self.assertCountEqual(fresh.get_supported_os_list(), ['windows', 'linux', 'macos'])
+            fresh.get_supported_os_list()
+
+    def test_supported_os_skips_non_list_values(self):
+        """Rows whose supported_os is not a JSON array are ignored, not an error."""
+        software = SoftwareFactory(slug='odd-os-tool')
+        SoftwareVersionFactory(software=software, supported_os=['linux'])
+        SoftwareVersionFactory(software=software, supported_os='windows')
+        SoftwareVersionFactory(software=software, supported_os={'os': 'macos'})
+
+        fresh = Software.objects.get(pk=software.pk)
+        self.assertEqual(fresh.get_supported_os_list(), ['linux'])
+
+    def test_increment_download_count_skips_refresh(self):
+        """The counter is bumped with one UPDATE and mirrored on the instance."""
+        software = SoftwareFactory(slug='counted-tool')
+        with self.assertNumQueries(1):
+            software.increment_download_count()
+        self.assertEqual(software.download_count, 1)
+        software.refresh_from_db()
+        self.assertEqual(software.download_count, 1)
+
+    def test_newest_first_orders_semantically(self):
+        """"10.0.0" is newer than "9.2.0" even though it sorts lower as a string."""
+        software = SoftwareFactory(slug='semver-tool')
+        for number in ('9.2.0', '10.0.0', '9.10.1'):
+            SoftwareVersionFactory(software=software, version_number=number)
+
+        ordered = SoftwareVersion.objects.filter(software=software).newest_first()
+        self.assertEqual(
+            list(ordered.values_list('version_number', flat=True)),
+            ['10.0.0', '9.10.1', '9.2.0'],
+        )
+
+
+class DownloadCounterTestCase(TestCase):
+
+    def test_record_download_writes_through_without_redis(self):
+        """With a non-Redis cache the download is counted immediately."""
+        software = SoftwareFactory(slug='direct-tool')
+        record_download(Software, software.pk)
+        software.refresh_from_db()
+        self.assertEqual(software.download_count, 1)
+
+    def test_apply_download_counts_batches_increments(self):
+        first = SoftwareFactory(slug='first-tool', download_count=5)
+        second = SoftwareFactory(slug='second-tool')
+        with self.assertNumQueries(1):
+            apply_download_counts(Software, {str(first.pk): 3, str(second.pk): 2})
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.download_count, second.download_count), (8, 2))
+
+
+class SoftwareVersionBulkCreateTestCase(TestCase):
+
+    def test_bulk_create_fills_derived_fields(self):
+        """bulk_create parses semver columns and normalizes OS names like save()."""
+        software = SoftwareFactory(slug='bulk-tool')
+        SoftwareVersion.objects.bulk_create([
+            SoftwareVersion(software=software, version_number='2.10.1', supported_os=['Windows']),
+            SoftwareVersion(software=software, version_number='2.9.0'),
+        ])
+
+        latest = SoftwareVersion.objects.filter(software=software).newest_first().first()
+        self.assertEqual((latest.version_major, latest.version_minor, latest.version_patch), (2, 10, 1))
+        self.assertEqual(latest.supported_os, ['Windows'])
+        self.assertEqual(latest.supported_os_normalized, ['windows'])
+        self.assertEqual(latest.id.version, 7)
@@ -0,0 +1,64 @@
+# FILE: /backend/apps/products/tests/test_tasks.py
+import hashlib
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from backend.apps.products.models import SoftwareVersion
+from backend.apps.products.tasks import compute_version_checksum
+from backend.apps.products.upload import ChecksumMemoryFileUploadHandler
+from tests.factories import SoftwareVersionFactory
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ComputeVersionChecksumTestCase(TestCase):
+
+    def test_upload_is_hashed_after_commit(self):
+        """Saving a binary marks the checksum pending; the task fills it in."""
+        data = b'installer-bytes' * 1000
+        version = SoftwareVersionFactory()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            version.binary_file.save('setup.exe', ContentFile(data))
+        version.refresh_from_db()
+        self.assertEqual(version.checksum_status, SoftwareVersion.ChecksumStatus.PENDING)
+        self.assertEqual(version.binary_checksum, '')
+        self.assertEqual(len(callbacks), 1)
+
+        compute_version_checksum(str(version.pk))
+
+        version.refresh_from_db()
+        self.assertEqual(version.checksum_status, SoftwareVersion.ChecksumStatus.READY)
+        self.assertEqual(version.binary_checksum, hashlib.sha256(data).hexdigest())
+
+    def test_streamed_digest_skips_the_task(self):
+        """An upload hashed by the checksum upload handlers is stored directly."""
+        data = b'streamed-bytes' * 1000
+        version = SoftwareVersionFactory()
+        upload = ContentFile(data, name='setup.exe')
+        upload.sha256 = hashlib.sha256(data).hexdigest()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            version.binary_file = upload
+            version.save()
+        version.refresh_from_db()
+        self.assertEqual(callbacks, [])
+        self.assertEqual(version.checksum_status, SoftwareVersion.ChecksumStatus.READY)
+        self.assertEqual(version.binary_checksum, upload.sha256)
+
+
+class ChecksumUploadHandlerTestCase(SimpleTestCase):
+
+    def test_uploaded_file_carries_sha256(self):
+        data = b'chunk-' * 5000
+        handler = ChecksumMemoryFileUploadHandler()
+        handler.handle_raw_input(None, {}, len(data), 'boundary')
+        # The memory handler claims the file by stopping later handlers
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file('binary_file', 'setup.exe', 'application/octet-stream', len(data))
+        for start in range(0, len(data), 4096):
+            handler.receive_data_chunk(data[start:start + 4096], start)
+        uploaded = handler.file_complete(len(data))
+        self.assertEqual(uploaded.sha256, hashlib.sha256(data).hexdigest())
@@ -0,0 +1,49 @@
+# FILE: /backend/apps/products/upload.py
+"""
+Upload handlers that hash binaries while the request body streams in.
+
+Each handler feeds every chunk to SHA-256 before passing it on, and attaches
+the hex digest to the finished UploadedFile as `sha256`. The pre_save signal
+(signals.update_binary_metadata) stores that digest directly instead of
+queueing compute_version_checksum to read the file back from storage.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+class _ChecksumMixin:
+    """Accumulate a SHA-256 of the current file's chunks."""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self._sha256.hexdigest()
+        return uploaded
+
+
+class ChecksumMemoryFileUploadHandler(_ChecksumMixin, MemoryFileUploadHandler):
+    pass
+
+
+class ChecksumTemporaryFileUploadHandler(_ChecksumMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def checksum_upload_handlers(request):
+    """Drop-in replacement for the default FILE_UPLOAD_HANDLERS pair."""
+    return [
+        ChecksumMemoryFileUploadHandler(request),
+        ChecksumTemporaryFileUploadHandler(request),
+    ]
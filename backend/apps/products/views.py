@@ -7,10 +7,11 @@ All changes are backward‑compatible and non‑disruptive.
 """
 import os
 import hashlib
+import hmac
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import F, Q
+from django.db.models import Q
 from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -24,11 +25,13 @@ from rest_framework.views import APIView          # <-- ADDED for new endpoint
 from backend.apps.accounts.models import SecurityLog
 from backend.apps.accounts.permissions import IsAdmin
 
+from .counters import record_download
 from .filters import SoftwareFilter
 from .models import (
     Category, Software, SoftwareDocument,
     SoftwareImage, SoftwareVersion,
-    SoftwareUsageEvent                     # <-- ADDED for telemetry
+    SoftwareUsageEvent,                    # <-- ADDED for telemetry
+    SEMVER_ORDERING,
 )
 from .serializers import (
     CategorySerializer,
@@ -38,6 +41,7 @@ from .serializers import (
     SoftwareVersionSerializer,
     SoftwareUsageEventSerializer            # <-- ADDED for telemetry
 )
+from .upload import checksum_upload_handlers
 
 
 # ----------------------------------------------------------------------
@@ -91,7 +95,7 @@ class CategoryViewSet(AdminWritePermissionMixin, viewsets.ModelViewSet):
     """
     ViewSet for software categories.
     """
-    queryset = Category.objects.all().order_by('display_order', 'name')
+    queryset = Category.objects.with_software_count().select_related('parent').order_by('display_order', 'name')
     serializer_class = CategorySerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'parent']
@@ -113,6 +117,16 @@ class CategoryViewSet(AdminWritePermissionMixin, viewsets.ModelViewSet):
         instance.delete()
 
 
+# ----------------------------------------------------------------------
+# Helper – relations SoftwareSerializer reads for every row
+# ----------------------------------------------------------------------
+def software_list_queryset():
+    """Software rows with everything SoftwareSerializer touches loaded up front."""
+    return Software.objects.select_related('category').prefetch_related(
+        'versions', 'images', 'documents', Software.LATEST_VERSION_PREFETCH
+    )
+
+
 # ----------------------------------------------------------------------
 # Software ViewSet – with dedicated FilterSet
 # ----------------------------------------------------------------------
@@ -120,9 +134,7 @@ class SoftwareViewSet(AdminWritePermissionMixin, ActiveOnlyMixin, viewsets.Model
     """
     ViewSet for software products.
     """
-    queryset = Software.objects.all().select_related('category').prefetch_related(
-        'versions', 'images', 'documents'
-    ).order_by('display_order', 'name')
+    queryset = software_list_queryset().order_by('display_order', 'name')
     serializer_class = SoftwareSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = SoftwareFilter
@@ -157,7 +169,7 @@ class SoftwareViewSet(AdminWritePermissionMixin, ActiveOnlyMixin, viewsets.Model
     @action(detail=True, methods=['get'], permission_classes=[AllowAny])
     def versions(self, request, slug=None):
         software = self.get_object()
-        versions = software.versions.all().order_by('-version_number')
+        versions = software.versions.newest_first()
         page = self.paginate_queryset(versions)
         if page is not None:
             serializer = SoftwareVersionSerializer(page, many=True, context={'request': request})
@@ -187,13 +199,18 @@ class SoftwareVersionViewSet(AdminWritePermissionMixin, ActiveOnlyMixin, viewset
     """
     ViewSet for software versions.
     """
-    queryset = SoftwareVersion.objects.all().select_related('software').order_by('-version_number')
+    queryset = SoftwareVersion.objects.select_related('software').newest_first()
     serializer_class = SoftwareVersionSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['software', 'is_active', 'is_beta', 'is_stable', 'is_signed']
     search_fields = ['version_number', 'version_code', 'release_name', 'release_notes']
     ordering_fields = ['version_number', 'released_at', 'download_count', 'created_at']
-    ordering = ['-version_number']
+    ordering = list(SEMVER_ORDERING)
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Hash uploaded binaries as they stream in; must be set before the body is parsed
+        request.upload_handlers = checksum_upload_handlers(request)
+        return super().initialize_request(request, *args, **kwargs)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -274,11 +291,7 @@ class SoftwareDocumentViewSet(AdminWritePermissionMixin, viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], permission_classes=[AllowAny])
     def download(self, request, pk=None):
         document = self.get_object()
-        # Atomic increment
-        SoftwareDocument.objects.filter(pk=document.pk).update(
-            download_count=F('download_count') + 1
-        )
-        document.refresh_from_db()
+        record_download(SoftwareDocument, document.pk)
 
         if not document.file:
             raise Http404("File not found")
@@ -303,7 +316,7 @@ class FeaturedSoftwareView(generics.ListAPIView):
     """
     Get featured software.
     """
-    queryset = Software.objects.filter(is_active=True, is_featured=True).order_by('display_order')[:10]
+    queryset = software_list_queryset().filter(is_active=True, is_featured=True).order_by('display_order')[:10]
     serializer_class = SoftwareSerializer
     permission_classes = [AllowAny]
     pagination_class = None
@@ -318,11 +331,12 @@ class NewReleasesView(generics.ListAPIView):
 
     def get_queryset(self):
         thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
-        # Single query using Q objects (more efficient than union)
-        return Software.objects.filter(
+        # Single query using Q objects (more efficient than union); no JOINs,
+        # so no DISTINCT needed
+        return software_list_queryset().filter(
             Q(is_active=True, is_new=True) |
             Q(is_active=True, released_at__gte=thirty_days_ago)
-        ).distinct().order_by('-released_at')
+        ).order_by('-released_at')
 
 
 # ----------------------------------------------------------------------
@@ -366,20 +380,16 @@ class SoftwareDownloadView(generics.GenericAPIView):
             expected_token = hashlib.sha256(
                 f"{software.id}|{version.id}|{settings.SECRET_KEY}".encode()
             ).hexdigest()[:32]
-            if token != expected_token:
+            if not hmac.compare_digest(token, expected_token):
                 return Response({'error': 'Invalid or expired download token'},
                                 status=status.HTTP_403_FORBIDDEN)
         except Exception:
             return Response({'error': 'Invalid token'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Atomically increment download counters
+        # Count the download (buffered in Redis when available)
         with transaction.atomic():
             software.increment_download_count()
-            # Atomic update for version download count
-            SoftwareVersion.objects.filter(pk=version.pk).update(
-                download_count=F('download_count') + 1
-            )
-            version.refresh_from_db()
+            record_download(SoftwareVersion, version.pk)
 
         # Security logging
         SecurityLog.objects.create(
@@ -479,7 +489,7 @@ class SoftwareVersionListView(generics.ListAPIView):
 
         slug = self.kwargs.get('slug')
         software = get_object_or_404(Software, slug=slug, is_active=True)
-        queryset = software.versions.filter(is_active=True).order_by('-version_number')
+        queryset = software.versions.filter(is_active=True).newest_first()
 
         # Non‑admins cannot see beta versions unless explicitly requested
         user = self.request.user
@@ -498,14 +508,12 @@ class SoftwareVersionListView(generics.ListAPIView):
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             response = self.get_paginated_response(serializer.data)
+            latest = software.get_latest_version(include_beta=False)
             response.data['software'] = {
                 'id': str(software.id),
                 'name': software.name,
                 'slug': software.slug,
-                'current_version': (
-                    software.get_latest_version(include_beta=False).version_number
-                    if software.get_latest_version(include_beta=False) else None
-                )
+                'current_version': latest.version_number if latest else None
             }
             return response
 
@@ -111,6 +111,13 @@ app.conf.beat_schedule = {
         'options': {'queue': 'analytics'}
     },
 
+    # Apply Redis-buffered download counters (every minute)
+    'flush-download-counts': {
+        'task': 'backend.apps.products.tasks.flush_download_counts',
+        'schedule': 60.0,
+        'options': {'queue': 'products'}
+    },
+
     # Dashboard snapshot update (every 10 minutes)
     'update-dashboard-snapshot': {
         'task': 'dashboard.tasks.update_dashboard_snapshot',
@@ -126,6 +133,9 @@ app.conf.task_routes = {
     'backend.apps.accounts.tasks.send_*': {
         'queue': 'emails'
     },
+    'backend.apps.payments.tasks.send_*': {
+        'queue': 'emails'
+    },
     # Maintenance tasks (specific)
     'backend.apps.accounts.tasks.cleanup_*': {
         'queue': 'maintenance'
@@ -388,6 +388,8 @@ PAYSTACK_WEBHOOK_MAX_SIZE = env.int("PAYSTACK_WEBHOOK_MAX_SIZE", default=102400)
 PAYSTACK_WEBHOOK_THROTTLE_RATE = env("PAYSTACK_WEBHOOK_THROTTLE_RATE", default="100/hour")
 # Optional IP allowlist – only enable behind trusted proxy
 PAYSTACK_WEBHOOK_ALLOWED_IPS = env.list("PAYSTACK_WEBHOOK_ALLOWED_IPS", default=None)
+# Seconds between batched GatewayEventLog flushes (0 = write inline)
+GATEWAY_EVENT_LOG_FLUSH_INTERVAL = env.float("GATEWAY_EVENT_LOG_FLUSH_INTERVAL", default=0.1)
 
 # Explicit domain for Paystack callback (fallback uses request host)
 DOMAIN_URL = env("DOMAIN_URL", default=SITE_URL)
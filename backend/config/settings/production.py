@@ -41,8 +41,23 @@ CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 
 # Database settings
-DATABASES["default"]["CONN_MAX_AGE"] = 600
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=600)
+# Persistent connections are re-validated at the start of each request instead of
+# failing the first query after a DB restart or idle timeout.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
 DATABASES["default"]["OPTIONS"]["sslmode"] = "require"
+# TCP keepalives so idle pooled connections aren't silently dropped by NAT/load balancers
+DATABASES["default"]["OPTIONS"].update({
+    "connect_timeout": env.int("DB_CONNECT_TIMEOUT", default=5),
+    "keepalives": 1,
+    "keepalives_idle": 60,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+})
+# Behind PgBouncer in transaction pooling mode, server-side cursors (used by
+# QuerySet.iterator()) don't survive across transactions and must be disabled.
+if env.bool("DB_PGBOUNCER_TRANSACTION_POOLING", default=False):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
 
 # Static files
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
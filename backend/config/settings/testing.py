@@ -31,6 +31,9 @@ CACHES = {
 # Disable email sending
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# Write gateway event logs synchronously instead of from the background flusher
+GATEWAY_EVENT_LOG_FLUSH_INTERVAL = 0
+
 # Disable CORS for testing
 CORS_ALLOW_ALL_ORIGINS = True
 